@@ -1,37 +1,86 @@
 """
 AI function calling package.
 This package contains functions that can be called by AI models.
+
+Submodules are imported lazily: nothing heavy (web3, eth_account, the EVM
+connection) is loaded until one of the functions is first accessed.
 """
 
-import inspect
-import ai.functions.ethereum as ethereum_module
-import ai.functions.sparkdex as sparkdex_module
-import ai.functions.token_addresses as token_addresses_module
+import importlib
+from collections.abc import Mapping
+
+# Functions exported by each module. This must match each module's __all__: listing
+# the names here keeps the lazy import, so update both when adding or removing a function.
+# Later modules win on name clashes, so token_addresses is registered last
+_EXPORTS = {
+    'ai.functions.ethereum': (
+        'get_eth_balance',
+        'estimate_gas_fee',
+        'send_transaction',
+        'get_transaction_status',
+        'get_network_info',
+        'get_my_address',
+    ),
+    'ai.functions.sparkdex': (
+        'get_sparkdex_info',
+        'get_v3_factory_info',
+        'get_pool_info',
+        'get_token_price',
+        'get_perp_markets',
+        'swap_tokens',
+        'get_user_positions',
+        'get_perp_positions',
+        'get_detailed_pool_data',
+        'get_token_info',
+        'get_token_balance',
+        'get_token_balances_batch',
+        'add_liquidity',
+        'create_pool',
+        'get_pool_details_by_address',
+        'calculate_price_from_sqrt_price_x96',
+    ),
+    'ai.functions.token_addresses': (
+        'get_token_address',
+        'get_token_info',
+        'get_token_by_address',
+    ),
+}
+
+# Function name -> module path that provides it
+_LAZY = {name: module_path for module_path, names in _EXPORTS.items() for name in names}
+
+def _resolve(name):
+    """Import the module that provides a function and return the function."""
+    return getattr(importlib.import_module(_LAZY[name]), name)
 
+class _LazyFunctions(Mapping):
+    """Read-only mapping of function name to function that imports modules on first access."""
 
+    def __init__(self):
+        self._resolved = {}
 
-# Automatically import all functions from the modules
-# Filter to only include callable objects (functions) that don't start with underscore
-available_functions = {}
+    def __getitem__(self, name):
+        if name not in self._resolved:
+            if name not in _LAZY:
+                raise KeyError(name)
+            self._resolved[name] = _resolve(name)
+        return self._resolved[name]
 
-# Import Ethereum functions
-for name, obj in inspect.getmembers(ethereum_module):
-    # Only include callable objects (functions) that don't start with underscore
-    if inspect.isfunction(obj) and not name.startswith('_'):
-        available_functions[name] = obj
+    def __iter__(self):
+        return iter(_LAZY)
 
-# Import SparkDEX functions
-for name, obj in inspect.getmembers(sparkdex_module):
-    # Only include callable objects (functions) that don't start with underscore
-    if inspect.isfunction(obj) and not name.startswith('_'):
-        available_functions[name] = obj
+    def __len__(self):
+        return len(_LAZY)
 
-# Import token_addresses functions
-for name, obj in inspect.getmembers(token_addresses_module):
-    # Only include callable objects (functions) that don't start with underscore
-    if inspect.isfunction(obj) and not name.startswith('_'):
-        available_functions[name] = obj
+available_functions = _LazyFunctions()
 
+# Make the functions available at the package level (PEP 562)
+def __getattr__(name):
+    if name in _LAZY:
+        func = available_functions[name]
+        globals()[name] = func
+        return func
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Make the functions available at the package level
-globals().update(available_functions)
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
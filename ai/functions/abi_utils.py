@@ -1,6 +1,29 @@
 import json
+import mmap
 import os
-from typing import Dict, Any, Optional
+import sys
+from typing import Dict, Any, Optional, Set, Tuple
+
+# Prefer orjson for parsing ABI files; fall back to the standard library if it isn't installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is the same either way.
+try:
+    from orjson import loads as _json_loads
+    _HAS_ORJSON = True
+except ImportError:
+    from json import loads as _json_loads
+    _HAS_ORJSON = False
+
+# Files at or above this size are memory-mapped instead of read into a bytes copy
+_MMAP_THRESHOLD = 16 * 1024
+
+# Optional low-memory mode: with FLARE_ABI_STREAMING=1 and ijson installed, single function/event
+# lookups stream through the ABI file instead of loading and caching the whole ABI
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_ABI_STREAMING = os.environ.get('FLARE_ABI_STREAMING') == '1' and ijson is not None
 
 # Directory where ABI files are stored
 ABI_DIR = os.path.join(os.path.dirname(__file__), 'abis')
@@ -12,6 +35,8 @@ CONTRACT_ABI_MAPPING = {
     "0x8a1E35F5c98C4E85B36B7B253222eE17773b2781": "swap_router_abi",  # SwapRouter
     "0x5B5513c55fd06e2658010c121c37b07fC8e8B705": "quoter_v2_abi",    # QuoterV2
     "0x8A2578d23d4C532cC9A98FaD91C0523f5efDE652": "v3_factory_abi",   # V3Factory
+    "0xcA11bde05977b3631167028862bE2a173976CA11": "multicall3_abi",   # Multicall3
+    "0xEE5FF5Bc5F852764b5584d92A4d592A53DC527da": "nonfungible_position_manager_abi",  # NonfungiblePositionManager
     
     # Token contracts
     "0x1D80c49BbBCd1C0911346656B529DF9E5c2F783d": "erc20",           # WFLR
@@ -25,9 +50,140 @@ CONTRACT_ABI_MAPPING = {
     # Add more mappings as needed
 }
 
+# Lowercase-keyed view of CONTRACT_ABI_MAPPING so address lookups are case-insensitive.
+# A plain dict is deliberate: str hashes are cached on the key objects, so a lookup is already
+# one probe, and a hand-rolled perfect hash in Python measured ~20x slower.
+_CONTRACT_ABI_MAPPING_LC = {k.lower(): sys.intern(v) for k, v in CONTRACT_ABI_MAPPING.items()}
+
 # Cache for loaded ABIs to avoid repeated disk reads
 _abi_cache: Dict[str, Any] = {}
 
+# Per-contract lookup tables built alongside _abi_cache: {'function': {name: item}, 'event': {name: item}}
+_abi_index_cache: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+
+# Cache for function signature strings keyed by (contract_name, function_name)
+_sig_cache: Dict[Tuple[str, str], str] = {}
+
+# Result of list_available_abis(), computed on first use
+_abi_list_cache: Optional[list] = None
+
+# Names and addresses already known to have no ABI file, so repeated misses skip the filesystem
+_abi_negative_cache: Set[str] = set()
+
+def _clear_abi_caches() -> None:
+    """Clear all ABI caches, including the negative cache (mainly useful for tests)."""
+    global _abi_list_cache
+    _abi_list_cache = None
+    _abi_cache.clear()
+    _abi_index_cache.clear()
+    _sig_cache.clear()
+    _abi_negative_cache.clear()
+
+def _build_abi_index(abi: list) -> Dict[str, Dict[str, Dict]]:
+    """
+    Build name-keyed lookup tables for the functions and events of an ABI.
+    
+    Args:
+        abi: The ABI as a list of items
+        
+    Returns:
+        A dictionary with 'function' and 'event' maps from name to ABI item
+    """
+    index = {'function': {}, 'event': {}}
+    for item in abi:
+        item_type = item.get('type')
+        if item_type in index and 'name' in item:
+            # Keep the first entry for overloaded names, matching the previous linear scan
+            index[item_type].setdefault(item['name'], item)
+    return index
+
+def _read_abi_file(file_path: str) -> Any:
+    """
+    Read and parse an ABI file, memory-mapping large files when orjson is available.
+    
+    Args:
+        file_path: Path to the ABI JSON file
+        
+    Returns:
+        The parsed ABI
+    """
+    # orjson can parse straight from a memoryview; the json module needs bytes
+    if _HAS_ORJSON and os.path.getsize(file_path) >= _MMAP_THRESHOLD:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return _json_loads(view)
+    
+    with open(file_path, 'rb') as f:
+        return _json_loads(f.read())
+
+def _abi_file_path(contract_name: str) -> str:
+    """
+    Get the path of the ABI file for a contract name or address.
+    
+    Args:
+        contract_name: Name of the contract or its address
+        
+    Returns:
+        The path to the ABI file (which may not exist)
+    """
+    if contract_name.startswith('0x'):
+        abi_name = _CONTRACT_ABI_MAPPING_LC.get(contract_name.lower())
+        if abi_name:
+            return os.path.join(ABI_DIR, f"{abi_name}.json")
+    return os.path.join(ABI_DIR, f"{contract_name}.json")
+
+def _find_abi_item_streaming(file_path: str, item_type: str, name: str) -> Optional[Dict]:
+    """
+    Stream through an ABI file and return the first item with the given type and name.
+    
+    Args:
+        file_path: Path to the ABI JSON file
+        item_type: The ABI item type (e.g., 'function' or 'event')
+        name: The item name
+        
+    Returns:
+        The ABI item or None if not found
+    """
+    with open(file_path, 'rb') as f:
+        for item in ijson.items(f, 'item'):
+            if item.get('type') == item_type and item.get('name') == name:
+                return item
+    return None
+
+def _abi_not_found(contract_name: str) -> FileNotFoundError:
+    """
+    Build the error for a missing ABI, so a first miss and a negative-cache hit report it the same way.
+    
+    Args:
+        contract_name: Name of the contract or its address
+        
+    Returns:
+        The FileNotFoundError to raise
+    """
+    if contract_name.startswith('0x') and contract_name.lower() not in _CONTRACT_ABI_MAPPING_LC:
+        return FileNotFoundError(f"No ABI file found for address {contract_name}")
+    return FileNotFoundError(f"ABI file not found: {_abi_file_path(contract_name)}")
+
+def _lookup_abi_item(contract_name: str, item_type: str, name: str) -> Optional[Dict]:
+    """
+    Find a function or event in a contract ABI, streaming the file when streaming mode is on
+    and the ABI isn't already cached.
+    """
+    if _ABI_STREAMING and contract_name not in _abi_index_cache:
+        if contract_name in _abi_negative_cache:
+            raise _abi_not_found(contract_name)
+        file_path = _abi_file_path(contract_name)
+        try:
+            return _find_abi_item_streaming(file_path, item_type, name)
+        except FileNotFoundError:
+            _abi_negative_cache.add(contract_name)
+            raise _abi_not_found(contract_name)
+        except ijson.JSONError:
+            raise ValueError(f"Invalid JSON in ABI file: {file_path}")
+    
+    load_abi(contract_name)
+    return _abi_index_cache[contract_name][item_type].get(name)
+
 def load_abi(contract_name: str) -> Dict:
     """
     Load an ABI from a JSON file by contract name or address.
@@ -45,33 +201,42 @@ def load_abi(contract_name: str) -> Dict:
     if contract_name in _abi_cache:
         return _abi_cache[contract_name]
     
+    # Fail fast on names we already know are missing
+    if contract_name in _abi_negative_cache:
+        raise _abi_not_found(contract_name)
+    
     # Try to find the file
     if contract_name.startswith('0x'):
-        # It's an address, check if we have a mapping for it
-        if contract_name in CONTRACT_ABI_MAPPING:
-            # Use the mapped ABI name
-            abi_name = CONTRACT_ABI_MAPPING[contract_name]
-            file_path = os.path.join(ABI_DIR, f"{abi_name}.json")
-        else:
-            # Try to load directly by address
-            file_path = os.path.join(ABI_DIR, f"{contract_name}.json")
-            if not os.path.exists(file_path):
-                # If not found by address, try common names
-                raise FileNotFoundError(f"No ABI file found for address {contract_name}")
+        # It's an address, check if we have a mapping for it (in any letter case)
+        abi_name = _CONTRACT_ABI_MAPPING_LC.get(contract_name.lower())
+        if abi_name:
+            # Reuse the mapped ABI if it is already loaded under its name
+            if abi_name in _abi_cache:
+                _abi_cache[contract_name] = _abi_cache[abi_name]
+                _abi_index_cache[contract_name] = _abi_index_cache[abi_name]
+                return _abi_cache[contract_name]
+        
+        # Use the mapped ABI name, or try to load directly by address
+        file_path = _abi_file_path(contract_name)
+        if not abi_name and not os.path.exists(file_path):
+            # If not found by address, remember the miss
+            _abi_negative_cache.add(contract_name)
+            raise _abi_not_found(contract_name)
     else:
         # It's a name, try to load by name
-        file_path = os.path.join(ABI_DIR, f"{contract_name}.json")
+        file_path = _abi_file_path(contract_name)
     
     # Load the ABI
     try:
-        with open(file_path, 'r') as f:
-            abi = json.load(f)
+        abi = _read_abi_file(file_path)
         
         # Cache it for future use
         _abi_cache[contract_name] = abi
+        _abi_index_cache[contract_name] = _build_abi_index(abi)
         return abi
     except FileNotFoundError:
-        raise FileNotFoundError(f"ABI file not found: {file_path}")
+        _abi_negative_cache.add(contract_name)
+        raise _abi_not_found(contract_name)
     except json.JSONDecodeError:
         raise ValueError(f"Invalid JSON in ABI file: {file_path}")
 
@@ -86,13 +251,7 @@ def get_function_abi(contract_name: str, function_name: str) -> Optional[Dict]:
     Returns:
         The function ABI or None if not found
     """
-    abi = load_abi(contract_name)
-    
-    for item in abi:
-        if item.get('type') == 'function' and item.get('name') == function_name:
-            return item
-    
-    return None
+    return _lookup_abi_item(contract_name, 'function', function_name)
 
 def get_event_abi(contract_name: str, event_name: str) -> Optional[Dict]:
     """
@@ -105,13 +264,7 @@ def get_event_abi(contract_name: str, event_name: str) -> Optional[Dict]:
     Returns:
         The event ABI or None if not found
     """
-    abi = load_abi(contract_name)
-    
-    for item in abi:
-        if item.get('type') == 'event' and item.get('name') == event_name:
-            return item
-    
-    return None
+    return _lookup_abi_item(contract_name, 'event', event_name)
 
 def list_available_abis() -> list:
     """
@@ -120,11 +273,17 @@ def list_available_abis() -> list:
     Returns:
         A list of available ABI names (without the .json extension)
     """
-    try:
-        files = os.listdir(ABI_DIR)
-        return [os.path.splitext(f)[0] for f in files if f.endswith('.json')]
-    except FileNotFoundError:
-        return []
+    global _abi_list_cache
+    
+    if _abi_list_cache is None:
+        try:
+            with os.scandir(ABI_DIR) as entries:
+                _abi_list_cache = [entry.name[:-len('.json')] for entry in entries
+                                   if entry.name.endswith('.json') and entry.is_file()]
+        except FileNotFoundError:
+            return []
+    
+    return list(_abi_list_cache)
 
 def get_function_signature(contract_name: str, function_name: str) -> str:
     """
@@ -140,12 +299,18 @@ def get_function_signature(contract_name: str, function_name: str) -> str:
     Raises:
         ValueError: If the function is not found
     """
+    cache_key = (contract_name, function_name)
+    if cache_key in _sig_cache:
+        return _sig_cache[cache_key]
+    
     func_abi = get_function_abi(contract_name, function_name)
     if not func_abi:
         raise ValueError(f"Function {function_name} not found in contract {contract_name}")
     
     input_types = [input_param.get('type') for input_param in func_abi.get('inputs', [])]
-    return f"{function_name}({','.join(input_types)})"
+    signature = f"{function_name}({','.join(input_types)})"
+    _sig_cache[cache_key] = signature
+    return signature
 
 def add_token_to_abi_mapping(token_address: str, abi_name: str = "erc20") -> bool:
     """
@@ -158,10 +323,39 @@ def add_token_to_abi_mapping(token_address: str, abi_name: str = "erc20") -> boo
     Returns:
         True if the token was added, False if it was already in the mapping
     """
-    global CONTRACT_ABI_MAPPING
+    global CONTRACT_ABI_MAPPING, _abi_list_cache
     
-    if token_address in CONTRACT_ABI_MAPPING:
+    if token_address.lower() in _CONTRACT_ABI_MAPPING_LC:
         return False
     
     CONTRACT_ABI_MAPPING[token_address] = abi_name
-    return True
\ No newline at end of file
+    _CONTRACT_ABI_MAPPING_LC[token_address.lower()] = sys.intern(abi_name)
+    # Lookups match addresses in any letter case, so forget misses recorded under any spelling
+    address_lc = token_address.lower()
+    _abi_negative_cache.difference_update([name for name in _abi_negative_cache if name.lower() == address_lc])
+    _abi_list_cache = None
+    return True
+
+def _preload_all() -> None:
+    """
+    Load every ABI file in ABI_DIR into the cache and alias the mapped contract addresses
+    to the same cached objects, so lookups by name or by address never touch the disk.
+    """
+    for name in list_available_abis():
+        # Address-named files shadowed by CONTRACT_ABI_MAPPING are never served, so don't parse them
+        if name.lower() in _CONTRACT_ABI_MAPPING_LC:
+            continue
+        try:
+            load_abi(name)
+        except (FileNotFoundError, ValueError):
+            # Leave broken files to be reported when they are actually requested
+            continue
+    
+    for address, abi_name in CONTRACT_ABI_MAPPING.items():
+        if abi_name in _abi_cache:
+            _abi_cache[address] = _abi_cache[abi_name]
+            _abi_index_cache[address] = _abi_index_cache[abi_name]
+
+# Warm the caches once at import time (skipped in streaming mode, which keeps ABIs off the heap)
+if not _ABI_STREAMING:
+    _preload_all()
@@ -3,16 +3,198 @@ Ethereum-related functions for AI function calling.
 These functions allow the AI to interact with the Ethereum blockchain.
 """
 from web3 import Web3
-from decimal import Decimal
+import hashlib
 import logging
+import operator
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from eth_account import Account
-from evm.connection import get_evm_connection
+from eth_account.datastructures import SignedTransaction
+from evm.connection import get_evm_connection, batch_calls
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Module logger; handlers and levels are configured by the application (see utils.logging_utils)
 logger = logging.getLogger(__name__)
 
+# Functions exposed to the AI function-calling layer
+__all__ = [
+    'get_eth_balance',
+    'estimate_gas_fee',
+    'send_transaction',
+    'get_transaction_status',
+    'get_network_info',
+    'get_my_address',
+]
+
+# Accessor for the raw signed bytes; the attribute was renamed from rawTransaction to
+# raw_transaction in newer eth-account releases, so resolve it once for the installed version
+_GET_RAW_TX = operator.attrgetter(
+    'raw_transaction' if hasattr(SignedTransaction, 'raw_transaction') else 'rawTransaction'
+)
+
+# Shared pool for get_transaction_status's concurrent transaction and receipt lookups
+_status_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="eth-status")
+
+# Cheap syntactic check for 0x-prefixed hex addresses, run before the heavier Web3 validation
+_ADDR_RE = re.compile(r'^0x[0-9a-fA-F]{40}$')
+
+def _is_valid_address(address) -> bool:
+    """
+    Check whether a value is a valid 0x-prefixed Ethereum address.
+    
+    Args:
+        address: The value to check
+        
+    Returns:
+        True if the value is a valid address
+    """
+    if not isinstance(address, str) or not _ADDR_RE.match(address):
+        return False
+    
+    # Single-case addresses carry no checksum, so there's nothing more to verify
+    body = address[2:]
+    if body == body.lower() or body == body.upper():
+        return True
+    
+    # Mixed case: Web3.is_address accepts any well-formed hex address here and does not verify
+    # the EIP-55 checksum, so this is a format check only
+    return Web3.is_address(address)
+
+def _format_wei(wei: int, unit_decimals: int, places: int) -> str:
+    """
+    Format a wei amount in a larger unit with a fixed number of decimal places.
+    
+    Args:
+        wei: The amount in wei
+        unit_decimals: Decimals of the target unit (18 for ether, 9 for gwei)
+        places: Number of decimal places to show
+        
+    Returns:
+        The formatted amount, rounded half-to-even like round() on a Decimal
+    """
+    scaled, remainder = divmod(wei, 10 ** (unit_decimals - places))
+    half = 10 ** (unit_decimals - places) // 2
+    if remainder > half or (remainder == half and scaled % 2):
+        scaled += 1
+    whole, frac = divmod(scaled, 10 ** places)
+    return f"{whole}.{frac:0{places}d}"
+
+# Short-lived cache of connection.get_connection_status(), which refreshes block and gas price over RPC
+_network_cache = {'ts': 0.0, 'data': None, 'connection': None}
+
+def _cached_network_info(connection, ttl: float = 2.0):
+    """
+    Get the connection status, reusing the previous result if it is recent enough.
+    
+    Args:
+        connection: The EVM connection to query
+        ttl: Maximum age of the cached status in seconds
+        
+    Returns:
+        The dictionary returned by connection.get_connection_status()
+    """
+    now = time.monotonic()
+    if (_network_cache['data'] is None
+            or _network_cache['connection'] is not connection
+            or now - _network_cache['ts'] > ttl):
+        _network_cache['data'] = connection.get_connection_status()
+        _network_cache['connection'] = connection
+        _network_cache['ts'] = now
+    return _network_cache['data']
+
+# Next nonce to use for each sender address, shared by every module that sends transactions so
+# they never pick the same one. It is reconciled with the node's pending count whenever that is read.
+_nonce_cache = {}
+_nonce_lock = threading.Lock()
+
+# How far the tracked nonce may run ahead of the node's pending count before the node is trusted;
+# a small lead covers sends the node hasn't counted yet, a larger one means transactions were dropped
+_NONCE_MAX_LEAD = 2
+
+def _next_nonce(web3, address):
+    """
+    Reserve the next nonce for an address.
+    
+    Args:
+        web3: The Web3 instance to prime the nonce from
+        address: The sender address
+        
+    Returns:
+        The nonce to use for the next transaction from this address
+    """
+    with _nonce_lock:
+        nonce = _nonce_cache.get(address)
+        if nonce is None:
+            nonce = web3.eth.get_transaction_count(address, 'pending')
+        _nonce_cache[address] = nonce + 1
+        return nonce
+
+def _sync_nonce(address, pending_count):
+    """
+    Reconcile the tracked nonce with the node's pending transaction count.
+    
+    The higher one wins, unless the tracked nonce is more than _NONCE_MAX_LEAD ahead: then
+    transactions it counted were dropped from the mempool, and reusing their nonces closes the gap.
+    
+    Args:
+        address: The sender address
+        pending_count: The node's pending transaction count for the address
+    """
+    with _nonce_lock:
+        tracked = _nonce_cache.get(address, 0)
+        if tracked - pending_count > _NONCE_MAX_LEAD:
+            _nonce_cache[address] = pending_count
+        else:
+            _nonce_cache[address] = max(tracked, pending_count)
+
+def _reset_nonce(address):
+    """Forget the tracked nonce for an address so the next transaction re-reads it from the node."""
+    with _nonce_lock:
+        _nonce_cache.pop(address, None)
+
+def _clear_nonces():
+    """Forget all tracked nonces, e.g. when the connection switches to another chain."""
+    with _nonce_lock:
+        _nonce_cache.clear()
+
+# Accounts derived from private keys, keyed by a salted hash so the raw key is never used as a cache key
+_ACCOUNT_CACHE_SALT = os.urandom(16)
+_ACCOUNT_CACHE_SIZE = 8
+_account_cache = OrderedDict()
+
+def _account_from_key_cached(private_key: str):
+    """
+    Derive an account from a private key, reusing previously derived accounts.
+    
+    Args:
+        private_key: The hex private key, with or without the 0x prefix
+        
+    Returns:
+        An Account instance and its address.
+    """
+    # Normalize so every spelling of a key shares one cache entry
+    key_hex = private_key.removeprefix('0x').lower()
+    cache_key = hashlib.blake2b(key_hex.encode(), digest_size=16, salt=_ACCOUNT_CACHE_SALT).hexdigest()
+    
+    cached = _account_cache.get(cache_key)
+    if cached is not None:
+        _account_cache.move_to_end(cache_key)
+        return cached
+    
+    # Key derivation is an elliptic-curve multiplication, so only do it once per key
+    account = Account.from_key(bytes.fromhex(key_hex))
+    cached = (account, account.address)
+    logger.info("Created account with address: %s", account.address)
+    
+    _account_cache[cache_key] = cached
+    if len(_account_cache) > _ACCOUNT_CACHE_SIZE:
+        _account_cache.popitem(last=False)
+    
+    return cached
+
 def _get_account_from_private_key(private_key: str = None):
     """
     Get an Ethereum account from a private key.
@@ -23,6 +205,8 @@ def _get_account_from_private_key(private_key: str = None):
     Returns:
         An Account instance and its address.
     """
+    global _env_account
+    
     try:
         # If no private key is provided, try to get it from environment
         if not private_key:
@@ -30,22 +214,46 @@ def _get_account_from_private_key(private_key: str = None):
             if not private_key:
                 logger.error("No private key provided and PRIVATE_KEY environment variable not set")
                 return None, None
-        
-        # Ensure private key has 0x prefix
-        if not private_key.startswith('0x'):
-            private_key = '0x' + private_key
+            
+            # Reuse the account bound to the environment key unless the variable has changed
+            if private_key == _env_account[0]:
+                return _env_account[1]
+            
+            result = _account_from_key_cached(private_key)
+            _env_account = (private_key, result)
+            return result
         
         # Create account from private key
-        account = Account.from_key(private_key)
-        address = account.address
-        
-        logger.info(f"Created account with address: {address}")
-        
-        return account, address
+        return _account_from_key_cached(private_key)
     except Exception as e:
-        logger.error(f"Error creating account from private key: {str(e)}")
+        logger.error("Error creating account from private key: %s", e)
         return None, None
 
+# Account bound to the PRIVATE_KEY environment variable as (env value, (account, address)).
+# main.py loads the key after import and /api/key/load can replace it, so it is re-bound on change.
+_env_account = (None, None)
+
+def _bind_env_account():
+    """Bind the account for PRIVATE_KEY at import time if the variable is already set."""
+    if os.environ.get('PRIVATE_KEY'):
+        _get_account_from_private_key()
+
+_bind_env_account()
+
+def _balance_for(web3, address: str):
+    """
+    Fetch the balance of an already-validated address.
+    
+    Args:
+        web3: The Web3 instance to use
+        address: The address to check
+        
+    Returns:
+        The balance in wei and formatted to 6 decimal places in ETH
+    """
+    balance_wei = web3.eth.get_balance(address)
+    return balance_wei, _format_wei(balance_wei, 18, 6)
+
 def get_eth_balance(address: str):
     """
     Get the Ethereum balance for a given address.
@@ -58,7 +266,7 @@ def get_eth_balance(address: str):
     """
     try:
         # Validate the address
-        if not Web3.is_address(address):
+        if not _is_valid_address(address):
             return {
                 "error": f"Invalid Ethereum address: {address}",
                 "status": "error"
@@ -74,18 +282,14 @@ def get_eth_balance(address: str):
         
         web3 = connection.web3
         
-        # Get the balance
-        balance_wei = web3.eth.get_balance(address)
-        balance_eth = web3.from_wei(balance_wei, 'ether')
-        
-        # Format the balance to 6 decimal places
-        formatted_balance = str(round(Decimal(balance_eth), 6))
+        # Get the balance, formatted to 6 decimal places
+        balance_wei, formatted_balance = _balance_for(web3, address)
         
         # Get network information
-        network_info = connection.get_connection_status()['network']
+        network_info = _cached_network_info(connection)['network']
         network_name = network_info.get('name', 'Unknown')
         
-        logger.info(f"Retrieved balance for {address} on {network_name}: {formatted_balance} ETH")
+        logger.info("Retrieved balance for %s on %s: %s ETH", address, network_name, formatted_balance)
         
         return {
             "address": address,
@@ -117,13 +321,13 @@ def estimate_gas_fee(from_address: str, to_address: str, value: str = "0"):
     """
     try:
         # Validate addresses
-        if not Web3.is_address(from_address):
+        if not _is_valid_address(from_address):
             return {
                 "error": f"Invalid sender address: {from_address}",
                 "status": "error"
             }
         
-        if not Web3.is_address(to_address):
+        if not _is_valid_address(to_address):
             return {
                 "error": f"Invalid recipient address: {to_address}",
                 "status": "error"
@@ -169,14 +373,12 @@ def estimate_gas_fee(from_address: str, to_address: str, value: str = "0"):
         
         # Calculate total gas cost
         gas_cost_wei = gas_estimate * gas_price
-        gas_cost_eth = web3.from_wei(gas_cost_wei, 'ether')
-        gas_price_gwei = web3.from_wei(gas_price, 'gwei')
         
         # Get network information
-        network_info = connection.get_connection_status()['network']
+        network_info = _cached_network_info(connection)['network']
         network_name = network_info.get('name', 'Unknown')
         
-        logger.info(f"Estimated gas for transaction from {from_address} to {to_address} on {network_name}: {gas_estimate} units")
+        logger.info("Estimated gas for transaction from %s to %s on %s: %s units", from_address, to_address, network_name, gas_estimate)
         
         return {
             "from": from_address,
@@ -184,10 +386,10 @@ def estimate_gas_fee(from_address: str, to_address: str, value: str = "0"):
             "value": value,
             "value_wei": str(value_wei),
             "gas_units": str(gas_estimate),
-            "gas_price": str(round(Decimal(gas_price_gwei), 2)),
+            "gas_price": _format_wei(gas_price, 9, 2),
             "gas_price_wei": str(gas_price),
             "unit_price": "gwei",
-            "total_gas_cost": str(round(Decimal(gas_cost_eth), 6)),
+            "total_gas_cost": _format_wei(gas_cost_wei, 18, 6),
             "total_gas_cost_wei": str(gas_cost_wei),
             "unit": "ETH",
             "network": network_name,
@@ -223,7 +425,7 @@ def send_transaction(to_address: str, value: str, private_key: str = None):
             }
         
         # Validate recipient address
-        if not Web3.is_address(to_address):
+        if not _is_valid_address(to_address):
             return {
                 "error": f"Invalid recipient address: {to_address}",
                 "status": "error"
@@ -248,12 +450,16 @@ def send_transaction(to_address: str, value: str, private_key: str = None):
                 "status": "error"
             }
         
-        # Check if the sender has enough balance
-        balance_wei = web3.eth.get_balance(from_address)
-        gas_price = web3.eth.gas_price
+        # Fetch balance, gas price and pending transaction count in a single batched round trip
+        balance_wei, gas_price, pending_count = batch_calls(web3, [
+            lambda: web3.eth.get_balance(from_address),
+            lambda: web3.eth.gas_price,
+            lambda: web3.eth.get_transaction_count(from_address, 'pending'),
+        ])
+        _sync_nonce(from_address, pending_count)
         gas_limit = 21000  # Standard gas limit for ETH transfers
         
-        # Calculate total cost (value + gas)
+        # Check if the sender has enough balance for the value plus gas
         total_cost_wei = value_wei + (gas_limit * gas_price)
         
         if balance_wei < total_cost_wei:
@@ -264,41 +470,40 @@ def send_transaction(to_address: str, value: str, private_key: str = None):
                 "status": "error"
             }
         
-        # Get the nonce for the sender address
-        nonce = web3.eth.get_transaction_count(from_address)
-        
         # Get network information
-        network_info = connection.get_connection_status()['network']
+        network_info = _cached_network_info(connection)['network']
         network_name = network_info.get('name', 'Unknown')
         
-        # Create transaction dictionary
+        # Create transaction dictionary, taking the nonce from the counter SparkDEX transactions share
         tx = {
             'from': from_address,
             'to': to_address,
             'value': value_wei,
-            'nonce': nonce,
+            'nonce': _next_nonce(web3, from_address),
             'gas': gas_limit,
             'gasPrice': gas_price,
-            'chainId': web3.eth.chain_id
+            'chainId': connection.get_chain_id()
         }
         
-        # Sign the transaction
-        signed_tx = web3.eth.account.sign_transaction(tx, private_key=account.key.hex())
-        
-        # Debug logging
-        logger.info(f"Signed transaction: {type(signed_tx)}")
-        logger.info(f"Signed transaction attributes: {dir(signed_tx)}")
-        
-        # Send the transaction - use the correct attribute based on Web3.py version
-        if hasattr(signed_tx, 'rawTransaction'):
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        else:
-            # For newer Web3.py versions
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        try:
+            # Sign the transaction
+            signed_tx = web3.eth.account.sign_transaction(tx, private_key=account.key)
+            
+            # Debug logging (dir() builds a new list, so skip it unless DEBUG is enabled)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Signed transaction: %s", type(signed_tx))
+                logger.debug("Signed transaction attributes: %s", dir(signed_tx))
+            
+            # Send the transaction using the raw-bytes attribute of the installed eth-account version
+            tx_hash = web3.eth.send_raw_transaction(_GET_RAW_TX(signed_tx))
+        except Exception:
+            # The nonce wasn't consumed (or our count is stale), so re-read it next time
+            _reset_nonce(from_address)
+            raise
         
         tx_hash_hex = web3.to_hex(tx_hash)
         
-        logger.info(f"Transaction sent on {network_name}: {tx_hash_hex}")
+        logger.info("Transaction sent on %s: %s", network_name, tx_hash_hex)
         
         return {
             "from": from_address,
@@ -343,12 +548,17 @@ def get_transaction_status(tx_hash: str):
             tx_hash = '0x' + tx_hash
         
         # Get network information
-        network_info = connection.get_connection_status()['network']
+        network_info = _cached_network_info(connection)['network']
         network_name = network_info.get('name', 'Unknown')
         
+        # Request the transaction and its receipt concurrently; a pending
+        # transaction makes the receipt lookup raise, so they can't share a batch
+        tx_future = _status_pool.submit(web3.eth.get_transaction, tx_hash)
+        receipt_future = _status_pool.submit(web3.eth.get_transaction_receipt, tx_hash)
+        
         # Get the transaction
         try:
-            tx = web3.eth.get_transaction(tx_hash)
+            tx = tx_future.result()
             if not tx:
                 return {
                     "error": f"Transaction not found: {tx_hash}",
@@ -362,7 +572,7 @@ def get_transaction_status(tx_hash: str):
         
         # Get transaction receipt to check status
         try:
-            receipt = web3.eth.get_transaction_receipt(tx_hash)
+            receipt = receipt_future.result()
             if receipt:
                 status = "confirmed" if receipt.status == 1 else "failed"
                 block_number = receipt.blockNumber
@@ -393,7 +603,7 @@ def get_transaction_status(tx_hash: str):
         if gas_used is not None:
             result["gas_used"] = gas_used
         
-        logger.info(f"Transaction {tx_hash} status on {network_name}: {status}")
+        logger.info("Transaction %s status on %s: %s", tx_hash, network_name, status)
         
         return result
     except Exception as e:
@@ -421,7 +631,7 @@ def get_network_info():
             }
         
         # Get network information
-        network_info = connection.get_connection_status()
+        network_info = _cached_network_info(connection)
         
         return {
             "network": network_info['network']['name'],
@@ -465,18 +675,22 @@ def get_my_address():
             }
         
         # Get network information
-        network_info = connection.get_connection_status()['network']
+        network_info = _cached_network_info(connection)['network']
         network_name = network_info.get('name', 'Unknown')
         
-        # Get the balance
-        balance = get_eth_balance(address)
+        # Get the balance directly; the address comes from our own account, so it needs no validation
+        try:
+            _, formatted_balance = _balance_for(connection.web3, address)
+        except Exception as e:
+            logger.error("Error getting balance for %s: %s", address, e)
+            formatted_balance = "Unknown"
         
-        logger.info(f"Retrieved user address on {network_name}: {address}")
+        logger.info("Retrieved user address on %s: %s", network_name, address)
         
         return {
             "address": address,
             "network": network_name,
-            "balance": balance.get("balance") if balance.get("status") == "success" else "Unknown",
+            "balance": formatted_balance,
             "unit": "ETH",
             "status": "success"
         }
@@ -3,20 +3,64 @@ SparkDEX-related functions for AI function calling.
 These functions allow the AI to interact with SparkDEX contracts on the Flare network.
 """
 import os
+import math
 import json
 import logging
-import requests
+import functools
+import threading
+import sqlite3
+from typing import List, NamedTuple, Tuple
 from web3 import Web3
-from decimal import Decimal
-from eth_account import Account
-from evm.connection import get_evm_connection
+from web3.exceptions import BadFunctionCallOutput, TimeExhausted, TransactionNotFound
+from decimal import Decimal, Context, MAX_PREC
+from eth_abi import encode as abi_encode, decode as abi_decode
+from eth_utils import function_signature_to_4byte_selector, keccak
+from eth_utils.abi import get_abi_output_types
+from evm.connection import get_evm_connection, get_http_session, batch_calls
 from .abi_utils import load_abi, get_function_abi, get_event_abi
+# Shares ethereum.py's derived-account cache, so a key is derived once across both modules
+from .ethereum import _get_account_from_private_key, _GET_RAW_TX, _next_nonce, _reset_nonce, _sync_nonce, _clear_nonces
+from .token_addresses import TOKEN_INFO
 from web3.middleware import ExtraDataToPOAMiddleware
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as HTTPConnectionError
+from urllib3.util.retry import Retry
+
+# Prefer orjson for decoding explorer responses; fall back to the standard library if it isn't installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Functions exposed to the AI function-calling layer
+__all__ = [
+    'get_sparkdex_info',
+    'get_v3_factory_info',
+    'get_pool_info',
+    'get_token_price',
+    'get_perp_markets',
+    'swap_tokens',
+    'get_user_positions',
+    'get_perp_positions',
+    'get_detailed_pool_data',
+    'get_token_info',
+    'get_token_balance',
+    'get_token_balances_batch',
+    'add_liquidity',
+    'create_pool',
+    'get_pool_details_by_address',
+    'calculate_price_from_sqrt_price_x96',
+]
+
 # SparkDEX contract addresses
 SPARKDEX_CONTRACTS = {
     # V3.1 DEX
@@ -36,38 +80,199 @@ SPARKDEX_CONTRACTS = {
     "fundingTracker": "0xC03cD72b17d5eD82397d26e78be6CcE3184d8978"
 }
 
-def _get_account_from_private_key(private_key=None):
+# Address normalizer: checksumming costs a keccak hash, so each distinct address is only hashed once.
+# Raises ValueError for anything that isn't a valid address.
+_to_checksum_address = functools.lru_cache(maxsize=4096)(Web3.to_checksum_address)
+
+# Normalize once at import so the constants can be used as-is everywhere
+SPARKDEX_CONTRACTS = {name: _to_checksum_address(address) for name, address in SPARKDEX_CONTRACTS.items()}
+
+# Allowances at or above this are treated as unlimited (we always approve 2**256 - 1)
+_UNLIMITED_ALLOWANCE = 2**255
+
+# NonfungiblePositionManager IncreaseLiquidity(uint256 indexed tokenId, uint128, uint256, uint256) topic
+_INCREASE_LIQUIDITY_TOPIC = keccak(text="IncreaseLiquidity(uint256,uint128,uint256,uint256)")
+
+# (owner, token, spender) triples known to have an unlimited allowance, so repeat swaps and
+# liquidity adds skip the check
+_infinite_approvals = set()
+
+# Fixed-point scales used by V3 prices: sqrtPriceX96 = sqrt(price) * 2**96
+_Q96 = 1 << 96
+_Q192 = 1 << 192
+_Q192_DECIMAL = Decimal(_Q192)
+
+# Unbounded precision, so scaling a raw token amount by its decimals is exact
+_EXACT_CONTEXT = Context(prec=MAX_PREC)
+
+# Pool token0/token1/fee/tickSpacing/factory and ERC20 name/symbol/decimals never change, so they are cached
+# (LRU) for the life of the process. Mutable pool state is cached per block for the last few blocks.
+# Flask serves requests on several threads, so the LRUs are only touched under _cache_lock.
+_cache_lock = threading.Lock()
+_METADATA_CACHE_SIZE = 4096
+_POOL_STATE_CACHE_SIZE = 16
+_pool_address_cache = OrderedDict()
+_pool_immutables_cache = OrderedDict()
+_erc20_metadata_cache = OrderedDict()
+_pool_state_cache = OrderedDict()
+
+# (name, symbol, decimals) of the well-known Flare tokens, so they never need an RPC. TOKEN_INFO
+# holds Flare mainnet addresses, so this only applies when connected to chain 14.
+_FLARE_CHAIN_ID = 14
+_STATIC_ERC20_METADATA = {
+    _to_checksum_address(info["address"]): (info["name"], symbol, info["decimals"])
+    for symbol, info in TOKEN_INFO.items()
+}
+
+# Last block number seen in a pool state read; treated as current for about one Flare block time
+_BLOCK_NUMBER_TTL = 1.0
+_latest_block = {'number': None, 'seen_at': 0.0}
+
+# Multicall3 is deployed at the same address on Flare and most other EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Maximum number of calls packed into one aggregate3 eth_call
+_MULTICALL_CHUNK_SIZE = 500
+
+# Web3 instances whose chain has no Multicall3 deployed; they go straight to JSON-RPC batches
+_multicall3_missing = set()
+
+# Maximum number of requests per JSON-RPC batch (many public RPC endpoints cap batches at 20)
+_RPC_BATCH_SIZE = 20
+
+# Common fee tiers in V3: 0.01%, 0.05%, 0.3%, 1%
+_V3_FEE_TIERS = (100, 500, 3000, 10000)
+
+# Factory tick spacing per enabled fee tier; the factory can't change or disable a tier once set
+_fee_tick_spacings = {}
+
+# Shared pool for independent view calls that can't be batched, so their round-trips overlap
+_rpc_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sparkdex-rpc")
+
+# On-disk caches (explorer ABIs, ERC20 metadata), so they survive process restarts
+_DISK_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'flare-dapp')
+_ABI_DISK_CACHE_DIR = os.path.join(_DISK_CACHE_DIR, 'abi')
+
+# Flare Explorer API. Its requests share the pooled keep-alive session, through an adapter
+# that also retries transient failures (these are idempotent GETs) with a short backoff.
+_EXPLORER_API_URL = "https://api.flarescan.com/api"
+get_http_session().mount(_EXPLORER_API_URL, HTTPAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 502, 503, 504))
+))
+
+# Cached ABIs younger than this are used without asking the explorer; older ones are
+# revalidated with a conditional GET, which costs a 304 instead of a full download
+_ABI_CACHE_TTL = 24 * 60 * 60
+
+def _read_cached_abi(contract_address):
     """
-    Get an Ethereum account from a private key.
+    Read an explorer ABI entry from the on-disk cache.
+    
+    Returns:
+        A dict with the ABI and its validators ('abi', 'etag', 'last_modified', 'fetched_at'),
+        or None if it isn't cached
+    """
+    try:
+        with open(os.path.join(_ABI_DISK_CACHE_DIR, f"{contract_address}.json"), 'rb') as f:
+            entry = _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    # Entries written before validators were stored are just the ABI
+    if isinstance(entry, list):
+        return {'abi': entry, 'etag': None, 'last_modified': None, 'fetched_at': 0}
+    return entry
+
+def _write_cached_abi(contract_address, entry):
+    """Persist an explorer ABI entry to the on-disk cache (best effort)."""
+    try:
+        os.makedirs(_ABI_DISK_CACHE_DIR, exist_ok=True)
+        path = os.path.join(_ABI_DISK_CACHE_DIR, f"{contract_address}.json")
+        # Write to a temporary file first so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not cache ABI for {contract_address}: {str(e)}")
+
+def _fetch_explorer_abi(contract_address, cached=None):
+    """
+    Fetch a contract ABI from the Flare Explorer API.
+    
+    When a cached entry is given, the request is conditional on its ETag / Last-Modified,
+    and a 304 Not Modified response reuses the cached ABI.
     
     Args:
-        private_key: The private key to use. If None, uses environment variable.
+        contract_address: The checksummed contract address
+        cached: The cached entry from _read_cached_abi (optional)
         
     Returns:
-        An Account instance and its address.
+        The ABI, or None if the explorer has no verified ABI for the contract
+    """
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    api_url = f"{_EXPLORER_API_URL}?module=contract&action=getabi&address={contract_address}"
+    response = get_http_session().get(api_url, headers=headers, timeout=10)
+    
+    if response.status_code == 304 and cached:
+        abi = cached['abi']
+    elif response.status_code == 200:
+        result = _json_loads(response.content)
+        if result.get("status") != "1" or not result.get("result"):
+            return None
+        abi = _json_loads(result.get("result"))
+    else:
+        return None
+    
+    # A 304 may omit the validators, in which case the cached ones still apply
+    previous = cached if response.status_code == 304 else {}
+    _write_cached_abi(contract_address, {
+        'abi': abi,
+        'etag': response.headers.get('ETag') or previous.get('etag'),
+        'last_modified': response.headers.get('Last-Modified') or previous.get('last_modified'),
+        'fetched_at': time.time()
+    })
+    return abi
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_contract_abi(contract_address):
+    """
+    Resolve the ABI for a checksummed contract address.
+    
+    Tries the bundled ABIs, then the on-disk cache, then the Flare Explorer API.
+    Raises when no ABI is found, so failures (e.g. network errors) are not memoized.
     """
+    # First try to load from our local ABIs
     try:
-        # If no private key is provided, try to get it from environment
-        if not private_key:
-            private_key = os.environ.get('PRIVATE_KEY')
-            if not private_key:
-                logger.error("No private key provided and PRIVATE_KEY environment variable not set")
-                return None, None
-        
-        # Ensure private key has 0x prefix
-        if not private_key.startswith('0x'):
-            private_key = '0x' + private_key
-        
-        # Create account from private key
-        account = Account.from_key(private_key)
-        address = account.address
-        
-        logger.info(f"Created account with address: {address}")
-        
-        return account, address
+        return load_abi(contract_address)
+    except FileNotFoundError:
+        pass
+    
+    # Then from ABIs fetched by a previous run, while they are fresh
+    cached = _read_cached_abi(contract_address)
+    if cached and time.time() - cached.get('fetched_at', 0) < _ABI_CACHE_TTL:
+        return cached['abi']
+    
+    # If not found locally (or the cached copy is stale), ask the Flare Explorer API
+    try:
+        abi = _fetch_explorer_abi(contract_address, cached)
     except Exception as e:
-        logger.error(f"Error creating account from private key: {str(e)}")
-        return None, None
+        if not cached:
+            raise
+        # The explorer is unreachable, so a stale copy is better than none
+        logger.warning(f"Could not revalidate ABI for {contract_address}, using cached copy: {str(e)}")
+        return cached['abi']
+    
+    if abi:
+        return abi
+    raise LookupError(f"No ABI found for contract {contract_address}")
 
 def _get_contract_abi(contract_address):
     """
@@ -80,31 +285,94 @@ def _get_contract_abi(contract_address):
         The contract ABI as a JSON object
     """
     try:
-        # First try to load from our local ABIs
-        try:
-            return load_abi(contract_address)
-        except FileNotFoundError:
-            pass
-        
-        # If not found locally, try to get from Flare Explorer API
-        api_url = f"https://api.flarescan.com/api?module=contract&action=getabi&address={contract_address}"
-        response = requests.get(api_url)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get("status") == "1" and result.get("result"):
-                return json.loads(result.get("result"))
-        
-        logger.error(f"No ABI found for contract {contract_address}")
-        return None
+        return _resolve_contract_abi(_to_checksum_address(contract_address))
     except Exception as e:
         logger.error(f"Error getting ABI for {contract_address}: {str(e)}")
         return None
 
+@functools.lru_cache(maxsize=1024)
+def _build_contract(web3, contract_address, abi_name):
+    """
+    Build a contract instance for a checksummed address and an ABI name (None = look up by address).
+    
+    Raises when the ABI can't be found, so failures are not memoized.
+    """
+    abi = _get_contract_abi(contract_address) if abi_name is None else load_abi(abi_name)
+    if not abi:
+        raise LookupError(f"Failed to load ABI: {abi_name or contract_address}")
+    return web3.eth.contract(address=contract_address, abi=abi)
+
+# Web3 instance resolved from the global EVM connection, cached so calls skip the lookup
+_web3 = None
+
+def _get_web3():
+    """
+    Get the shared Web3 instance of the current EVM connection.
+    
+    The instance is reused for as long as it is the connection's. When it changes, because
+    _invalidate_web3() forced a reconnect or /api/evm/connect replaced the connection (possibly
+    with another chain), everything cached for the old instance is dropped.
+    
+    Returns:
+        The Web3 instance, or None if the node can't be reached
+    """
+    global _web3
+    connection = get_evm_connection()
+    if not connection:
+        return None
+    if connection.connected and connection.web3 is _web3:
+        return _web3
+    if not connection.connected and not connection.connect():
+        return None
+    if connection.web3 is not _web3:
+        _reset_connection_state()
+        _ensure_poa_middleware(connection.web3)
+        _web3 = connection.web3
+    return _web3
+
+def _invalidate_web3():
+    """Mark the EVM connection as failed so the next _get_web3() call reconnects."""
+    connection = get_evm_connection()
+    if connection:
+        connection.connected = False
+
+def _reset_connection_state():
+    """
+    Drop state tied to the previous Web3 instance or to the chain it was connected to.
+    
+    Contracts are bound to the instance, and nonces, pools, token metadata, approvals and gas
+    estimates are per chain; the persisted metadata is keyed on chain ID, so it stays valid.
+    """
+    _build_contract.cache_clear()
+    _multicall3_missing.clear()
+    _node_accounts.clear()
+    _clear_nonces()
+    with _cache_lock:
+        for cache in (_pool_address_cache, _pool_immutables_cache, _pool_state_cache, _erc20_metadata_cache):
+            cache.clear()
+    _latest_block['number'], _latest_block['seen_at'] = None, 0.0
+    _infinite_approvals.clear()
+    _gas_limit_cache.clear()
+    _fee_tick_spacings.clear()
+
+# First account managed by the node, per Web3 instance (eth_accounts is itself an RPC)
+_node_accounts = {}
+
+def _get_node_account(web3):
+    """Get the node's first account, or None if it has none (an empty list isn't cached, it may change)."""
+    account = _node_accounts.get(web3)
+    if account is None:
+        accounts = web3.eth.accounts
+        if accounts:
+            account = _node_accounts[web3] = accounts[0]
+    return account
+
 def _get_contract(contract_address, abi=None):
     """
     Get a Web3 contract instance.
     
+    Contracts built from an ABI name (or looked up by address) are cached per Web3 instance.
+    
     Args:
         contract_address: The contract address
         abi: The contract ABI (optional) or ABI name (e.g., "v3_pool_abi")
@@ -113,41 +381,486 @@ def _get_contract(contract_address, abi=None):
         A Web3 contract instance
     """
     try:
-        # Get Web3 connection
-        connection = get_evm_connection()
-        if not connection or not connection.connected:
+        web3 = _get_web3()
+        if web3 is None:
             logger.error("Failed to connect to Ethereum node")
             return None
         
-        web3 = connection.web3
+        contract_address = _to_checksum_address(contract_address)
         
-        # Add PoA middleware if not already added
-        _ensure_poa_middleware(web3)
+        # An explicit ABI list can't be used as a cache key, so build the contract directly
+        if abi and not isinstance(abi, str):
+            return web3.eth.contract(address=contract_address, abi=abi)
         
-        # Get ABI if not provided
-        if not abi:
-            abi = _get_contract_abi(contract_address)
-            if not abi:
-                return None
-        elif isinstance(abi, str):
-            # If abi is a string, it's an ABI name, so load it
-            try:
-                abi = load_abi(abi)
-                if not abi:
-                    logger.error(f"Failed to load ABI: {abi}")
-                    return None
-            except Exception as e:
-                logger.error(f"Error loading ABI {abi}: {str(e)}")
-                return None
-        
-        # Create contract instance
-        contract = web3.eth.contract(address=contract_address, abi=abi)
-        return contract
+        return _build_contract(web3, contract_address, abi or None)
     except Exception as e:
         logger.error(f"Error creating contract instance for {contract_address}: {str(e)}")
         return None
 
+class _RawCall(NamedTuple):
+    """A contract view call with precomputed calldata, bypassing ContractFunction construction."""
+    address: str
+    data: bytes
+    output_types: Tuple[str, ...]
+
+# Output types of hot getters, keyed by function signature. Their selectors are computed once
+# here, so building a call is just a byte concatenation instead of a ContractFunction
+# allocation plus argument validation.
+_HOT_CALL_OUTPUT_TYPES = {
+    # V3 pool
+    'token0()': ('address',),
+    'token1()': ('address',),
+    'fee()': ('uint24',),
+    'tickSpacing()': ('int24',),
+    'factory()': ('address',),
+    'liquidity()': ('uint128',),
+    'slot0()': ('uint160', 'int24', 'uint16', 'uint16', 'uint16', 'uint8', 'bool'),
+    'feeGrowthGlobal0X128()': ('uint256',),
+    'feeGrowthGlobal1X128()': ('uint256',),
+    # ERC20
+    'name()': ('string',),
+    'symbol()': ('string',),
+    'decimals()': ('uint8',),
+    'balanceOf(address)': ('uint256',),
+    'allowance(address,address)': ('uint256',),
+    'totalSupply()': ('uint256',),
+    # Multicall3
+    'getBlockNumber()': ('uint256',),
+    # NonfungiblePositionManager
+    'tokenOfOwnerByIndex(address,uint256)': ('uint256',),
+    'positions(uint256)': (
+        'uint96', 'address', 'address', 'address', 'uint24', 'int24', 'int24',
+        'uint128', 'uint256', 'uint256', 'uint128', 'uint128'
+    ),
+}
+
+# Signature -> (selector, input types, output types)
+_HOT_CALLS = {
+    signature: (
+        function_signature_to_4byte_selector(signature),
+        tuple(t for t in signature[signature.index('(') + 1:-1].split(',') if t),
+        output_types
+    )
+    for signature, output_types in _HOT_CALL_OUTPUT_TYPES.items()
+}
+
+# Direct 32-byte encoders for the argument types hot calls take. Addresses are already
+# checksummed at the public API boundary, so this skips eth_abi's validation, which re-runs
+# a Keccak checksum check on every address argument (e.g. each balanceOf in a large batch).
+def _encode_address_word(value):
+    """ABI-encode a 0x-prefixed hex address as a left-padded 32-byte word."""
+    if isinstance(value, str) and len(value) == 42 and value.startswith('0x'):
+        return bytes(12) + bytes.fromhex(value[2:])
+    return abi_encode(['address'], [value])
+
+_WORD_ENCODERS = {
+    'address': _encode_address_word,
+    'uint256': lambda value: value.to_bytes(32, 'big'),
+}
+
+def _hot_call(address, signature, *args):
+    """
+    Build a call to one of the precomputed hot getters.
+    
+    Args:
+        address: The checksummed contract address
+        signature: The function signature, e.g. "positions(uint256)"
+        *args: The function arguments
+        
+    Returns:
+        A _RawCall that can be passed to _multicall3, _batch_eth_call or _raw_call
+    """
+    selector, input_types, output_types = _HOT_CALLS[signature]
+    if all(input_type in _WORD_ENCODERS for input_type in input_types):
+        data = selector + b''.join(_WORD_ENCODERS[t](arg) for t, arg in zip(input_types, args))
+    else:
+        data = selector + abi_encode(input_types, args)
+    return _RawCall(address, data, output_types)
+
+# SwapRouter.exactInputSingle and QuoterV2.quoteExactInputSingle take a single params struct.
+# Swaps encode it directly instead of going through ContractFunction dispatch and validation.
+_EXACT_INPUT_SINGLE_PARAMS = '(address,address,uint24,address,uint256,uint256,uint256,uint160)'
+_EXACT_INPUT_SINGLE_SELECTOR = function_signature_to_4byte_selector(f'exactInputSingle({_EXACT_INPUT_SINGLE_PARAMS})')
+_QUOTE_EXACT_INPUT_SINGLE_PARAMS = '(address,address,uint256,uint24,uint160)'
+_QUOTE_EXACT_INPUT_SINGLE_SELECTOR = function_signature_to_4byte_selector(
+    f'quoteExactInputSingle({_QUOTE_EXACT_INPUT_SINGLE_PARAMS})'
+)
+# amountOut, sqrtPriceX96After, initializedTicksCrossed, gasEstimate
+_QUOTE_EXACT_INPUT_SINGLE_OUTPUT_TYPES = ('uint256', 'uint160', 'uint32', 'uint256')
 
+def _quote_exact_input_single_call(quoter_address, token_in, token_out, fee, amount_in):
+    """
+    Build a QuoterV2.quoteExactInputSingle call with no price limit.
+    
+    Args:
+        quoter_address: The checksummed QuoterV2 address
+        token_in: The checksummed input token address
+        token_out: The checksummed output token address
+        fee: The pool fee tier
+        amount_in: The input amount in token base units
+        
+    Returns:
+        A _RawCall whose result is (amountOut, sqrtPriceX96After, initializedTicksCrossed, gasEstimate)
+    """
+    data = _QUOTE_EXACT_INPUT_SINGLE_SELECTOR + abi_encode(
+        [_QUOTE_EXACT_INPUT_SINGLE_PARAMS],
+        [(Web3.to_bytes(hexstr=token_in), Web3.to_bytes(hexstr=token_out), amount_in, fee, 0)]
+    )
+    return _RawCall(quoter_address, data, _QUOTE_EXACT_INPUT_SINGLE_OUTPUT_TYPES)
+
+def _call_spec(call):
+    """Get (address, calldata, output types) for a _RawCall or a bound contract function call."""
+    if isinstance(call, tuple):
+        return call
+    return call.address, Web3.to_bytes(hexstr=call._encode_transaction_data()), get_abi_output_types(call.abi)
+
+@functools.lru_cache(maxsize=256)
+def _address_output_positions(output_types):
+    """
+    Get the positions of the top-level address outputs of a function.
+    
+    Returns None when an address is nested in an array or tuple, since only the generic
+    normalizer walk can reach it.
+    """
+    positions = []
+    for i, output_type in enumerate(output_types):
+        if output_type == 'address':
+            positions.append(i)
+        elif 'address' in output_type:
+            return None
+    return tuple(positions)
+
+def _decode_output(output_types, data):
+    """
+    Decode the raw return data of a contract call.
+    
+    Args:
+        output_types: The ABI output types of the function
+        data: The raw bytes returned by the call
+        
+    Returns:
+        The decoded value, shaped like ContractFunction.call() (a single value or a list)
+    """
+    output_types = tuple(output_types)
+    decoded = abi_decode(output_types, data)
+    
+    # Same normalization call() applies, so addresses come back checksummed. For flat outputs
+    # the address slots are known up front, which skips map_abi_data's per-value type walk.
+    address_positions = _address_output_positions(output_types)
+    if address_positions is None:
+        normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    elif address_positions:
+        normalized = list(decoded)
+        for i in address_positions:
+            normalized[i] = _to_checksum_address(normalized[i])
+    else:
+        normalized = decoded
+    return normalized[0] if len(normalized) == 1 else list(normalized)
+
+def _raw_call(web3, call):
+    """Execute a single contract view call with eth_call and decode the result."""
+    address, data, output_types = _call_spec(call)
+    return _decode_output(output_types, web3.eth.call({'to': address, 'data': data}))
+
+def _call_each(web3, calls, allow_failure=False):
+    """Execute contract view calls as separate, concurrent eth_calls (fallback when batching is unavailable)."""
+    futures = [_rpc_pool.submit(_raw_call, web3, call) for call in calls]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception:
+            if not allow_failure:
+                raise
+            results.append(None)
+    return results
+
+def _multicall3(calls, allow_failure=False):
+    """
+    Execute several contract view calls in a single eth_call using Multicall3 aggregate3.
+    
+    Args:
+        calls: A list of _RawCall or bound contract function calls (e.g. pool_contract.functions.fee())
+        allow_failure: If True, a failing call returns None instead of failing the whole batch
+        
+    Returns:
+        A list with the decoded result of each call, in the same order as calls
+    """
+    if not calls:
+        return []
+    
+    web3 = _get_web3()
+    if web3 is None:
+        raise ConnectionError("Failed to connect to Ethereum node")
+    multicall_contract = _get_contract(MULTICALL3_ADDRESS, "multicall3_abi")
+    if multicall_contract is None:
+        raise ValueError("Could not create the Multicall3 contract instance")
+    
+    results = []
+    for start in range(0, len(calls), _MULTICALL_CHUNK_SIZE):
+        chunk = calls[start:start + _MULTICALL_CHUNK_SIZE]
+        specs = [_call_spec(call) for call in chunk]
+        try:
+            if web3 in _multicall3_missing:
+                return_data = None
+            else:
+                encoded_calls = [(address, allow_failure, data) for address, data, _ in specs]
+                return_data = multicall_contract.functions.aggregate3(encoded_calls).call()
+        except Exception as e:
+            # e.g. Multicall3 not deployed on this chain, or a call reverted with allow_failure=False
+            logger.warning(f"Multicall3 aggregate failed, falling back to individual calls: {str(e)}")
+            if isinstance(e, BadFunctionCallOutput):
+                # An empty result means there is no contract at the address, so stop trying it
+                _multicall3_missing.add(web3)
+            return_data = None
+        
+        if return_data is None:
+            if allow_failure:
+                # Failures are tolerated, so the calls can still share one JSON-RPC batch
+                results.extend(_batch_eth_call(web3, specs))
+            else:
+                results.extend(_call_each(web3, specs))
+            continue
+        
+        for (address, _, output_types), (success, data) in zip(specs, return_data):
+            try:
+                if not success:
+                    raise ValueError(f"Call to {address} failed")
+                results.append(_decode_output(output_types, data))
+            except Exception:
+                if not allow_failure:
+                    raise
+                results.append(None)
+    
+    return results
+
+def _batch_eth_call(web3, calls):
+    """
+    Execute contract view calls as eth_call requests sent in JSON-RPC batches.
+    
+    Unlike web3.batch_requests(), a call that reverts doesn't fail the rest of the batch.
+    
+    Args:
+        web3: The Web3 instance to send the requests through
+        calls: A list of _RawCall or bound contract function calls
+        
+    Returns:
+        A list with the decoded result of each call (None for calls that failed), in order
+    """
+    if not calls:
+        return []
+    
+    specs = [_call_spec(call) for call in calls]
+    try:
+        results = []
+        for start in range(0, len(specs), _RPC_BATCH_SIZE):
+            chunk = specs[start:start + _RPC_BATCH_SIZE]
+            responses = web3.provider.make_batch_request([
+                ("eth_call", [{"to": address, "data": Web3.to_hex(data)}, "latest"])
+                for address, data, _ in chunk
+            ])
+            if not isinstance(responses, list):
+                # The node rejected the batch as a whole
+                raise ValueError(f"Batch request failed: {responses.get('error')}")
+            
+            for (_, _, output_types), response in zip(chunk, responses):
+                try:
+                    results.append(_decode_output(output_types, Web3.to_bytes(hexstr=response["result"])))
+                except Exception:
+                    results.append(None)
+        return results
+    except Exception as e:
+        logger.warning(f"JSON-RPC batch failed, falling back to individual calls: {str(e)}")
+        return _call_each(web3, specs, allow_failure=True)
+
+def _cache_get(cache, key):
+    """Look up a key in an LRU OrderedDict cache, marking it as recently used."""
+    with _cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+def _cache_put(cache, key, value, max_size):
+    """Store a value in an LRU OrderedDict cache, evicting the least recently used entry if full."""
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+
+def _get_pool_state(pool):
+    """
+    Get the immutable metadata and current state of a V3 pool.
+    
+    Metadata is cached forever and state per block, so a repeated lookup within the same block
+    makes no RPCs, and any other lookup makes a single multicall.
+    
+    Args:
+        pool: The checksummed pool address
+        
+    Returns:
+        ((token0, token1, fee, tickSpacing, factory),
+         (slot0, liquidity, feeGrowthGlobal0X128, feeGrowthGlobal1X128))
+    """
+    immutables = _cache_get(_pool_immutables_cache, pool)
+    
+    block_number = _latest_block['number']
+    if immutables is not None and time.time() - _latest_block['seen_at'] < _BLOCK_NUMBER_TTL:
+        state = _cache_get(_pool_state_cache, (pool, block_number))
+        if state is not None:
+            return immutables, state
+    
+    # Read the block number in the same multicall so the state can be keyed on it
+    calls = [
+        _hot_call(MULTICALL3_ADDRESS, 'getBlockNumber()'),
+        _hot_call(pool, 'slot0()'),
+        _hot_call(pool, 'liquidity()'),
+        _hot_call(pool, 'feeGrowthGlobal0X128()'),
+        _hot_call(pool, 'feeGrowthGlobal1X128()'),
+    ]
+    if immutables is None:
+        calls += [
+            _hot_call(pool, 'token0()'), _hot_call(pool, 'token1()'), _hot_call(pool, 'fee()'),
+            _hot_call(pool, 'tickSpacing()'), _hot_call(pool, 'factory()')
+        ]
+    
+    results = _multicall3(calls, allow_failure=True)
+    if any(result is None for result in results[1:]):
+        raise ValueError(f"Failed to read pool state for {pool}")
+    
+    block_number, state = results[0], tuple(results[1:5])
+    if immutables is None:
+        immutables = tuple(results[5:])
+        _cache_put(_pool_immutables_cache, pool, immutables, _METADATA_CACHE_SIZE)
+    
+    # Without Multicall3 there is no block number to key on, so the state isn't cached
+    if block_number is not None:
+        _cache_put(_pool_state_cache, (pool, block_number), state, _POOL_STATE_CACHE_SIZE)
+        _latest_block['number'], _latest_block['seen_at'] = block_number, time.time()
+    
+    return immutables, state
+
+# ERC20 metadata persisted across restarts, keyed on (chain_id, address). The fields are
+# immutable, so by default entries never expire; set a TTL in seconds to refetch them.
+_ERC20_METADATA_DB = os.path.join(_DISK_CACHE_DIR, 'erc20_metadata.sqlite3')
+_ERC20_METADATA_DISK_TTL = None
+
+# One connection, opened and initialized on first use and shared by all threads under the lock
+_metadata_db = None
+_metadata_db_lock = threading.Lock()
+
+def _get_metadata_db():
+    """
+    Get the shared ERC20 metadata database connection, creating the database on first use.
+    
+    Must be called with _metadata_db_lock held, which also serializes use of the connection.
+    """
+    global _metadata_db
+    if _metadata_db is not None:
+        return _metadata_db
+    os.makedirs(_DISK_CACHE_DIR, exist_ok=True)
+    db = sqlite3.connect(_ERC20_METADATA_DB, timeout=5, check_same_thread=False)
+    # WAL lets concurrent workers read while another one writes
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS erc20_meta ("
+        "chain_id INTEGER, address TEXT, name TEXT, symbol TEXT, decimals INTEGER, fetched_at INTEGER, "
+        "PRIMARY KEY (chain_id, address))"
+    )
+    _metadata_db = db
+    return db
+
+def _read_persisted_metadata(chain_id, tokens):
+    """Read ERC20 metadata from the on-disk cache (best effort), as {token: (name, symbol, decimals)}."""
+    min_fetched_at = 0 if _ERC20_METADATA_DISK_TTL is None else int(time.time() - _ERC20_METADATA_DISK_TTL)
+    metadata = {}
+    try:
+        with _metadata_db_lock:
+            db = _get_metadata_db()
+            # Stay well under SQLite's limit on bound parameters per statement
+            for start in range(0, len(tokens), 500):
+                chunk = tokens[start:start + 500]
+                rows = db.execute(
+                    f"SELECT address, name, symbol, decimals FROM erc20_meta "
+                    f"WHERE chain_id = ? AND fetched_at >= ? AND address IN ({','.join('?' * len(chunk))})",
+                    [chain_id, min_fetched_at, *chunk]
+                )
+                metadata.update((address, (name, symbol, decimals)) for address, name, symbol, decimals in rows)
+        return metadata
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not read cached ERC20 metadata: {str(e)}")
+        return {}
+
+def _write_persisted_metadata(chain_id, metadata):
+    """Persist ERC20 metadata ({token: (name, symbol, decimals)}) to the on-disk cache (best effort)."""
+    now = int(time.time())
+    try:
+        with _metadata_db_lock:
+            db = _get_metadata_db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO erc20_meta VALUES (?, ?, ?, ?, ?, ?)",
+                    [(chain_id, token, *values, now) for token, values in metadata.items()]
+                )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not cache ERC20 metadata: {str(e)}")
+
+def _get_erc20_metadata(tokens, extra_calls=()):
+    """
+    Get the name, symbol and decimals of ERC20 tokens, fetching uncached ones in a single multicall.
+    
+    These never change after deployment, so they are cached per token; mutable reads the caller
+    needs anyway (e.g. totalSupply or balanceOf) can ride along in the same multicall.
+    
+    Args:
+        tokens: Checksummed token addresses
+        extra_calls: Other calls to send in the same multicall (failures come back as None)
+        
+    Returns:
+        A list of (name, symbol, decimals) per token, with None for values the token doesn't
+        provide, and the list of results of extra_calls
+    """
+    # The chain ID is cached on the connection, so this costs no RPC after the first call
+    chain_id = get_evm_connection().get_chain_id()
+    static_metadata = _STATIC_ERC20_METADATA if chain_id == _FLARE_CHAIN_ID else {}
+    
+    metadata = {}
+    missing = []
+    for token in dict.fromkeys(tokens):
+        cached = static_metadata.get(token) or _cache_get(_erc20_metadata_cache, token)
+        if cached is None:
+            missing.append(token)
+        else:
+            metadata[token] = cached
+    
+    # Then tokens resolved by a previous run
+    if missing:
+        for token, values in _read_persisted_metadata(chain_id, missing).items():
+            metadata[token] = values
+            _cache_put(_erc20_metadata_cache, token, values, _METADATA_CACHE_SIZE)
+        missing = [token for token in missing if token not in metadata]
+    
+    if not missing and not extra_calls:
+        return [metadata[token] for token in tokens], []
+    
+    results = _multicall3([
+        call for token in missing
+        for call in (_hot_call(token, 'name()'), _hot_call(token, 'symbol()'), _hot_call(token, 'decimals()'))
+    ] + list(extra_calls), allow_failure=True)
+    
+    fetched = {}
+    for i, token in enumerate(missing):
+        metadata[token] = tuple(results[3 * i:3 * i + 3])
+        # Every ERC20 has decimals, so without it the call likely failed transiently; don't cache that.
+        # Name and symbol are optional and may legitimately be missing.
+        if metadata[token][2] is not None:
+            _cache_put(_erc20_metadata_cache, token, metadata[token], _METADATA_CACHE_SIZE)
+            fetched[token] = metadata[token]
+    if fetched:
+        _write_persisted_metadata(chain_id, fetched)
+    
+    return [metadata[token] for token in tokens], results[3 * len(missing):]
 
 def get_sparkdex_info():
     """
@@ -200,25 +913,24 @@ def get_v3_factory_info():
                 "status": "error"
             }
         
-        # Get factory information
+        # Get factory information, probing all fee tiers in a single multicall
         try:
-            owner = factory_contract.functions.owner().call()
-            fee_amount_tickspacing = []
-            
-            # Common fee tiers in V3
-            fee_tiers = [100, 500, 3000, 10000]  # 0.01%, 0.05%, 0.3%, 1%
+            owner, *tick_spacings = _multicall3([
+                factory_contract.functions.owner(),
+                *(factory_contract.functions.feeAmountTickSpacing(fee) for fee in _V3_FEE_TIERS)
+            ], allow_failure=True)
+            if owner is None:
+                raise ValueError("owner() call failed")
             
-            for fee in fee_tiers:
-                try:
-                    tickSpacing = factory_contract.functions.feeAmountTickSpacing(fee).call()
+            fee_amount_tickspacing = []
+            for fee, tickSpacing in zip(_V3_FEE_TIERS, tick_spacings):
+                # A failed call means this fee tier might not be configured
+                if tickSpacing is not None:
                     fee_amount_tickspacing.append({
                         "fee": fee,
                         "tickSpacing": tickSpacing,
                         "feePercent": fee / 10000
                     })
-                except Exception:
-                    # This fee tier might not be configured
-                    pass
             
             return {
                 "address": factory_address,
@@ -253,13 +965,17 @@ def get_pool_info(token0_address: str, token1_address: str, fee: int = 3000):
     """
     try:
         # Validate addresses
-        if not Web3.is_address(token0_address):
+        try:
+            token0_address = _to_checksum_address(token0_address)
+        except ValueError:
             return {
                 "error": f"Invalid token0 address: {token0_address}",
                 "status": "error"
             }
         
-        if not Web3.is_address(token1_address):
+        try:
+            token1_address = _to_checksum_address(token1_address)
+        except ValueError:
             return {
                 "error": f"Invalid token1 address: {token1_address}",
                 "status": "error"
@@ -277,13 +993,18 @@ def get_pool_info(token0_address: str, token1_address: str, fee: int = 3000):
         
         # Get pool address
         try:
-            pool_address = factory_contract.functions.getPool(token0_address, token1_address, fee).call()
+            # A pool's address never changes once it exists, so only pools that exist are cached
+            pool_key = (token0_address, token1_address, fee)
+            pool_address = _cache_get(_pool_address_cache, pool_key)
+            if pool_address is None:
+                pool_address = factory_contract.functions.getPool(token0_address, token1_address, fee).call()
             
             if pool_address == '0x0000000000000000000000000000000000000000':
                 return {
                     "error": f"Pool does not exist for tokens {token0_address} and {token1_address} with fee {fee}",
                     "status": "error"
                 }
+            _cache_put(_pool_address_cache, pool_key, pool_address, _METADATA_CACHE_SIZE)
             
             # Get pool contract
             pool_contract = _get_contract(pool_address, "v3_pool_abi")
@@ -295,19 +1016,15 @@ def get_pool_info(token0_address: str, token1_address: str, fee: int = 3000):
                     "status": "partial"
                 }
             
-            # Get pool information
-            token0 = pool_contract.functions.token0().call()
-            token1 = pool_contract.functions.token1().call()
-            fee_actual = pool_contract.functions.fee().call()
-            liquidity = pool_contract.functions.liquidity().call()
-            slot0 = pool_contract.functions.slot0().call()
+            # Get pool information (at most a single round-trip)
+            (token0, token1, fee_actual, _, _), (slot0, liquidity, _, _) = _get_pool_state(pool_contract.address)
             
             # Format slot0 data
             sqrt_price_x96 = slot0[0]
             tick = slot0[1]
             
             # Calculate price from sqrtPriceX96
-            price = (sqrt_price_x96 / (2**96))**2
+            price = _price_from_sqrt_price_x96(sqrt_price_x96)
             
             return {
                 "pool_address": pool_address,
@@ -346,71 +1063,58 @@ def get_token_price(token_address: str, quote_token_address: str = "0x1D1F1A7280
     """
     try:
         # Validate addresses
-        if not Web3.is_address(token_address):
+        try:
+            token_address = _to_checksum_address(token_address)
+        except ValueError:
             return {
                 "error": f"Invalid token address: {token_address}",
                 "status": "error"
             }
         
-        if not Web3.is_address(quote_token_address):
+        try:
+            quote_token_address = _to_checksum_address(quote_token_address)
+        except ValueError:
             return {
                 "error": f"Invalid quote token address: {quote_token_address}",
                 "status": "error"
             }
         
-        # Get quoter contract
         quoter_address = SPARKDEX_CONTRACTS["quoterV2"]
-        quoter_contract = _get_contract(quoter_address, "quoter_v2_abi")
-        
-        if not quoter_contract:
-            return {
-                "error": f"Failed to get contract instance for {quoter_address}",
-                "status": "error"
-            }
         
         # Get Web3 connection
-        connection = get_evm_connection()
-        if not connection or not connection.connected:
+        web3 = _get_web3()
+        if web3 is None:
             return {
                 "error": "Failed to connect to Ethereum node",
                 "status": "error"
             }
         
-        web3 = connection.web3
-        
         # Amount to quote (1 token with 18 decimals)
         amount_in = 10**18
         
-        # Common fee tiers to try
-        fee_tiers = [100, 500, 3000, 10000]
+        # Quote every fee tier in one multicall and use the first tier that returns a quote
+        quotes = _multicall3([
+            _quote_exact_input_single_call(quoter_address, token_address, quote_token_address, fee, amount_in)
+            for fee in _V3_FEE_TIERS
+        ], allow_failure=True)
         
-        for fee in fee_tiers:
-            try:
-                # Try to get quote
-                quote_params = {
-                    'tokenIn': token_address,
-                    'tokenOut': quote_token_address,
-                    'fee': fee,
-                    'amountIn': amount_in,
-                    'sqrtPriceLimitX96': 0
-                }
-                
-                quote_result = quoter_contract.functions.quoteExactInputSingle(quote_params).call()
-                amount_out = quote_result[0]
-                
-                # Calculate price
-                price = amount_out / amount_in
-                
-                return {
-                    "token": token_address,
-                    "quote_token": quote_token_address,
-                    "price": price,
-                    "fee_tier": fee,
-                    "status": "success"
-                }
-            except Exception:
-                # Try next fee tier
+        for fee, quote_result in zip(_V3_FEE_TIERS, quotes):
+            if quote_result is None:
+                # No quote for this fee tier
                 continue
+            
+            amount_out = quote_result[0]
+            
+            # Calculate price
+            price = amount_out / amount_in
+            
+            return {
+                "token": token_address,
+                "quote_token": quote_token_address,
+                "price": price,
+                "fee_tier": fee,
+                "status": "success"
+            }
         
         # If we get here, we couldn't get a quote for any fee tier
         return {
@@ -447,10 +1151,13 @@ def get_perp_markets():
         try:
             # This is a placeholder - actual method depends on the contract implementation
             markets_count = position_manager_contract.functions.marketsCount().call()
-            markets = []
+            market_data = _multicall3([
+                position_manager_contract.functions.getMarketInfo(i)
+                for i in range(markets_count)
+            ])
             
-            for i in range(markets_count):
-                market_info = position_manager_contract.functions.getMarketInfo(i).call()
+            markets = []
+            for i, market_info in enumerate(market_data):
                 markets.append({
                     "index": i,
                     "name": market_info[0],
@@ -495,14 +1202,18 @@ def swap_tokens(token_in_address: str, token_out_address: str, amount_in: str, s
         logger.info(f"Starting token swap: {token_in_address} -> {token_out_address}, amount: {amount_in}")
         
         # Validate addresses
-        if not Web3.is_address(token_in_address):
+        try:
+            token_in_address = _to_checksum_address(token_in_address)
+        except ValueError:
             logger.error(f"Invalid input token address: {token_in_address}")
             return {
                 "error": f"Invalid input token address: {token_in_address}",
                 "status": "error"
             }
         
-        if not Web3.is_address(token_out_address):
+        try:
+            token_out_address = _to_checksum_address(token_out_address)
+        except ValueError:
             logger.error(f"Invalid output token address: {token_out_address}")
             return {
                 "error": f"Invalid output token address: {token_out_address}",
@@ -521,35 +1232,25 @@ def swap_tokens(token_in_address: str, token_out_address: str, amount_in: str, s
         
         # Get Web3 connection
         logger.info("Establishing Web3 connection")
-        connection = get_evm_connection()
-        if not connection or not connection.connected:
+        web3 = _get_web3()
+        if web3 is None:
             logger.error("Failed to connect to Ethereum node")
             return {
                 "error": "Failed to connect to Ethereum node",
                 "status": "error"
             }
         
-        web3 = connection.web3
+        # Fee fields and chain ID are shared by the approval and swap transactions
+        fee_params = _prepare_transactions(web3, from_address)
+        chain_id = get_evm_connection().get_chain_id()
         
-        # Ensure PoA middleware is added
-        logger.debug("Ensuring PoA middleware is added")
-        _ensure_poa_middleware(web3)
-        
-        # Get router contract
-        logger.info(f"Getting router contract at {SPARKDEX_CONTRACTS['swapRouter']}")
+        # Swaps go through the router, which is called with precomputed calldata
         router_address = SPARKDEX_CONTRACTS["swapRouter"]
-        router_contract = _get_contract(router_address, "swap_router_abi")
-        
-        if not router_contract:
-            logger.error(f"Failed to get contract instance for {router_address}")
-            return {
-                "error": f"Failed to get contract instance for {router_address}",
-                "status": "error"
-            }
+        logger.info(f"Using router at {router_address}")
         
         # Get token contracts
         logger.info(f"Getting token contract for {token_in_address}")
-        token_in_contract = _get_contract(token_in_address)
+        token_in_contract = _get_contract(token_in_address, "erc20")
         if not token_in_contract:
             logger.error(f"Failed to get contract instance for {token_in_address}")
             return {
@@ -557,66 +1258,90 @@ def swap_tokens(token_in_address: str, token_out_address: str, amount_in: str, s
                 "status": "error"
             }
         
-        # Get token decimals
+        # Get token decimals (cached per token), the sender's balance and, unless the router is
+        # known to have an unlimited allowance, the current allowance, all in one multicall
+        approval_key = (from_address, token_in_contract.address, router_address)
+        known_unlimited = approval_key in _infinite_approvals
+        prep_calls = [_hot_call(token_in_contract.address, 'balanceOf(address)', from_address)]
+        if not known_unlimited:
+            prep_calls.append(
+                _hot_call(token_in_contract.address, 'allowance(address,address)', from_address, router_address)
+            )
         try:
-            logger.info("Getting token decimals")
-            decimals = token_in_contract.functions.decimals().call()
+            logger.info("Getting token decimals, balance and allowance")
+            [(_, _, decimals)], prep_results = _get_erc20_metadata([token_in_contract.address], prep_calls)
+        except Exception as e:
+            logger.error(f"Error reading token decimals, balance and allowance: {str(e)}")
+            decimals, prep_results = None, [None] * len(prep_calls)
+        balance, allowance_result = prep_results[0], prep_results[1:]
+        
+        if decimals is not None:
             logger.debug(f"Token decimals: {decimals}")
             amount_in_wei = int(float(amount_in) * 10**decimals)
             logger.info(f"Amount in wei: {amount_in_wei}")
-        except Exception as e:
-            logger.error(f"Error getting token decimals: {str(e)}")
+        else:
+            logger.error("Error getting token decimals")
             # Default to 18 decimals if we can't get the actual value
             amount_in_wei = int(float(amount_in) * 10**18)
             logger.info(f"Using default 18 decimals. Amount in wei: {amount_in_wei}")
         
         amount_in_converted = int(amount_in)
+        
+        # A swap the wallet can't cover would only revert after paying for approval and gas
+        if balance is not None and decimals is not None and balance < amount_in_wei:
+            logger.error(f"Insufficient balance: {balance} < {amount_in_wei}")
+            return {
+                "error": f"Insufficient balance: have {balance} wei of {token_in_address}, need {amount_in_wei}",
+                "status": "error"
+            }
 
-        # Check allowance and approve if needed
+        # Check allowance and approve if needed. The approval isn't waited for here: the swap is
+        # sent right after it with the next nonce, so the node executes them in order.
+        approve_tx_hash = None
         try:
-            logger.info(f"Checking token allowance for router {router_address}")
-            allowance = token_in_contract.functions.allowance(from_address, router_address).call()
-            logger.debug(f"Current allowance: {allowance}")
-            
-            if allowance < amount_in_wei:
-                logger.info("Allowance insufficient, approving tokens")
-                # Approve router to spend tokens
-                approve_tx = token_in_contract.functions.approve(
-                    router_address,
-                    2**256 - 1  # Max uint256 value
-                ).build_transaction({
-                    'from': from_address,
-                    'nonce': web3.eth.get_transaction_count(from_address),
-                    'gas': 100000,
-                    'gasPrice': web3.eth.gas_price,
-                    'chainId': web3.eth.chain_id
-                })
+            if known_unlimited:
+                logger.info("Router already has an unlimited allowance, no approval needed")
+            else:
+                logger.info(f"Checking token allowance for router {router_address}")
+                allowance = allowance_result[0]
+                if allowance is None:
+                    raise ValueError(f"Failed to read allowance for router {router_address}")
+                logger.debug(f"Current allowance: {allowance}")
                 
-                # Sign and send approval transaction using our helper function
-                try:
-                    logger.info("Signing and sending approval transaction")
-                    tx_hash = _sign_and_send_transaction(web3, approve_tx, account)
-                    logger.info(f"Approval transaction sent: {tx_hash}")
-                    
-                    logger.info("Waiting for approval transaction receipt")
-                    receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-                    logger.info(f"Approval transaction confirmed: status={receipt.status}")
+                if allowance >= _UNLIMITED_ALLOWANCE:
+                    _infinite_approvals.add(approval_key)
+                
+                if allowance < amount_in_wei:
+                    logger.info("Allowance insufficient, approving tokens")
+                    # Approve router to spend tokens
+                    approve_call = token_in_contract.functions.approve(
+                        router_address,
+                        2**256 - 1  # Max uint256 value
+                    )
+                    approve_tx = approve_call.build_transaction({
+                        'from': from_address,
+                        'gas': _cached_gas_limit(
+                            ('approve', token_in_contract.address, router_address),
+                            lambda: approve_call.estimate_gas({'from': from_address}),
+                            100000
+                        ),
+                        'chainId': chain_id,
+                        **fee_params
+                    })
                     
-                    if receipt.status != 1:
-                        logger.error("Approval transaction failed")
+                    # Sign and send approval transaction using our helper function
+                    try:
+                        logger.info("Signing and sending approval transaction")
+                        approve_tx_hash = _sign_and_send_transaction(web3, approve_tx, account)
+                        logger.info(f"Approval transaction sent: {web3.to_hex(approve_tx_hash)}")
+                    except Exception as e:
+                        logger.error(f"Error approving tokens: {str(e)}")
                         return {
-                            "error": "Approval transaction failed",
-                            "tx_hash": web3.to_hex(tx_hash),
+                            "error": f"Error approving tokens: {str(e)}",
                             "status": "error"
                         }
-                except Exception as e:
-                    logger.error(f"Error approving tokens: {str(e)}")
-                    return {
-                        "error": f"Error approving tokens: {str(e)}",
-                        "status": "error"
-                    }
-            else:
-                logger.info("Token allowance sufficient, no approval needed")
+                else:
+                    logger.info("Token allowance sufficient, no approval needed")
         except Exception as e:
             logger.error(f"Error checking allowance: {str(e)}")
             return {
@@ -627,37 +1352,17 @@ def swap_tokens(token_in_address: str, token_out_address: str, amount_in: str, s
         # Get quote for minimum amount out
         logger.info("Getting quote for swap")
         quoter_address = SPARKDEX_CONTRACTS["quoterV2"]
-        quoter_contract = _get_contract(quoter_address, "quoter_v2_abi")
-        
-        if not quoter_contract:
-            logger.error(f"Failed to get contract instance for {quoter_address}")
-            return {
-                "error": f"Failed to get contract instance for {quoter_address}",
-                "status": "error"
-            }
         
         # Default fee tier
         fee = 3000  # 0.3%
         logger.info(f"Using fee tier: {fee} (0.3%)")
         
-        # Convert addresses to checksum format
-        token_in_checksum = Web3.to_checksum_address(token_in_address)
-        token_out_checksum = Web3.to_checksum_address(token_out_address)
-        logger.info(f"Converted token addresses to checksum format: {token_in_checksum}, {token_out_checksum}")
-
         # Try to get quote
         try:
-            logger.info("Preparing quote parameters")
-            quote_params = {
-                'tokenIn': token_in_checksum,
-                'tokenOut': token_out_checksum,
-                'fee': fee,
-                'amountIn': amount_in_wei,
-                'sqrtPriceLimitX96': 0
-            }
-            
             logger.info("Calling quoter contract")
-            quote_result = quoter_contract.functions.quoteExactInputSingle(quote_params).call()
+            quote_result = _raw_call(web3, _quote_exact_input_single_call(
+                quoter_address, token_in_address, token_out_address, fee, amount_in_wei
+            ))
             amount_out = quote_result[0]
             logger.info(f"Quote received: expected output amount = {amount_out}")
             
@@ -676,20 +1381,17 @@ def swap_tokens(token_in_address: str, token_out_address: str, amount_in: str, s
         deadline = current_time + 1200
         logger.info(f"Setting transaction deadline: {deadline} (current time + 20 minutes)")
         
-        token_in_bytes = Web3.to_bytes(hexstr=token_in_checksum)
-        token_out_bytes = Web3.to_bytes(hexstr=token_out_checksum)
-        recipient_checksum = Web3.to_bytes(hexstr=Web3.to_checksum_address(from_address))
+        token_in_bytes = Web3.to_bytes(hexstr=token_in_address)
+        token_out_bytes = Web3.to_bytes(hexstr=token_out_address)
         # Build swap transaction
         try:
             logger.info("Building swap transaction")
-            recipient_checksum = Web3.to_checksum_address(from_address)
-            logger.info(f"Converted recipient address to checksum format: {recipient_checksum}")
             
             swap_params = {
                 'tokenIn': token_in_bytes,
                 'tokenOut': token_out_bytes,
                 'fee': fee,
-                'recipient': recipient_checksum,
+                'recipient': Web3.to_bytes(hexstr=from_address),
                 'deadline': deadline,
                 'amountIn': amount_in_wei,
                 'amountOutMinimum': min_amount_out,
@@ -697,61 +1399,34 @@ def swap_tokens(token_in_address: str, token_out_address: str, amount_in: str, s
             }
             
             logger.info(f"Swap parameters: {swap_params}")
-            logger.info("Parameter types:")
-            for key, value in swap_params.items():
-                logger.info(f"{key}: {value} (type: {type(value)})")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Parameter types: { {key: type(value).__name__ for key, value in swap_params.items()} }")
             
             try:
-                nonce = web3.eth.get_transaction_count(from_address)
-                logger.info(f"Current nonce: {nonce}")
-            except Exception as e:
-                logger.error(f"Error getting transaction count: {str(e)}")
-                return {
-                    "error": f"Error getting transaction count: {str(e)}",
-                    "status": "error"
-                }
-            
-            try:
-                gas_price = web3.eth.gas_price
-                logger.info(f"Current gas price: {gas_price}")
-            except Exception as e:
-                logger.error(f"Error getting gas price: {str(e)}")
-                return {
-                    "error": f"Error getting gas price: {str(e)}",
-                    "status": "error"
-                }
-            
-            try:
-                chain_id = web3.eth.chain_id
-                logger.info(f"Chain ID: {chain_id}")
-            except Exception as e:
-                logger.error(f"Error getting chain ID: {str(e)}")
-                return {
-                    "error": f"Error getting chain ID: {str(e)}",
-                    "status": "error"
-                }
-            
-            try:
-                # Build transaction with more detailed error handling
+                # Encode the call directly; the struct fields are in the ABI's order
+                calldata = Web3.to_hex(_EXACT_INPUT_SINGLE_SELECTOR + abi_encode(
+                    [_EXACT_INPUT_SINGLE_PARAMS], [tuple(swap_params.values())]
+                ))
+                call_tx = {'from': from_address, 'to': router_address, 'data': calldata}
+                
+                # Build transaction with more detailed error handling. While an approval is still
+                # pending the swap would revert in estimate_gas, so only a cached estimate is used then.
+                swap_gas_key = ('swap', token_in_address, token_out_address, fee, amount_in_wei.bit_length())
                 tx_params = {
                     'from': from_address,
-                    'nonce': nonce,
-                    'gas': 600000,
-                    'gasPrice': gas_price,
-                    'chainId': chain_id,
-                }
-                logger.info(f"Transaction parameters: {tx_params}")
-                
-                # First check if the function exists
-                if not hasattr(router_contract.functions, 'exactInputSingle'):
-                    logger.error("Router contract does not have exactInputSingle function")
-                    return {
-                        "error": "Router contract does not have exactInputSingle function",
-                        "status": "error"
-                    }
+                    'gas': _cached_gas_limit(
+                        swap_gas_key,
+                        None if approve_tx_hash else lambda: web3.eth.estimate_gas(call_tx),
+                        600000,
+                        floor=_SWAP_GAS_FLOOR
+                    ),
+                    'chainId': chain_id,
+                    **fee_params
+                }
+                logger.info(f"Transaction parameters: {tx_params}")
                 
                 # Build the transaction
-                swap_tx = router_contract.functions.exactInputSingle(swap_params).build_transaction(tx_params)
+                swap_tx = {**call_tx, 'value': 0, **tx_params}
                 logger.info("Swap transaction built successfully")
             except Exception as e:
                 logger.error(f"Error building transaction object: {str(e)}")
@@ -761,65 +1436,42 @@ def swap_tokens(token_in_address: str, token_out_address: str, amount_in: str, s
                 }
             
             # Sign and send swap transaction using our helper function
-            logger.info("Starting inline transaction signing process")
-            try:
-                # Log transaction details
-                logger.info(f"Transaction to sign: gas={swap_tx.get('gas')}, nonce={swap_tx.get('nonce')}")
-                logger.info(f"Transaction destination: {swap_tx.get('to')}")
-                
-                # Ensure POA middleware is added
-                logger.debug("Ensuring POA middleware is added")
-                if ExtraDataToPOAMiddleware not in web3.middleware_onion:
-                    web3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
-                    logger.debug("Added POA middleware")
-                
-                # Log account details (safely)
-                logger.info(f"Signing with account: {account.address}")
-                
-                # Sign the transaction
-                logger.info("Signing transaction...")
-                signed_tx = web3.eth.account.sign_transaction(swap_tx, private_key=account.key)
-                logger.info("Transaction signed successfully")
-                
-                # Send the transaction
-                logger.info("Sending raw transaction to network...")
-                if hasattr(signed_tx, 'raw_transaction'):
-                    logger.debug("Using raw_transaction attribute (newer Web3.py)")
-                    tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                elif hasattr(signed_tx, 'rawTransaction'):
-                    logger.debug("Using rawTransaction attribute (older Web3.py)")
-                    tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-                else:
-                    error_msg = "Cannot find raw transaction data in signed transaction"
-                    logger.error(error_msg)
-                    raise Exception(error_msg)
-                
-                logger.info(f"Raw transaction sent successfully with hash: {tx_hash.hex()}")
-                
-                # Don't convert to hex string here - keep the original tx_hash object
-                # This should avoid the type conversion issue
-                
-            except Exception as e:
-                error_msg = f"Error in inline transaction signing/sending: {str(e)}"
-                logger.error(error_msg)
-                
-                # Log more details about the transaction that failed
-                try:
-                    logger.error("Transaction that failed:")
-                    for key, value in swap_tx.items():
-                        logger.error(f"  {key}: {value}")
-                except:
-                    logger.error("Could not log transaction details")
-                    
-                raise Exception(error_msg)
-            
-            # Now continue with the original code, using tx_hash directly
-            logger.info(f"Transaction hash (for logging): {tx_hash.hex()}")
-            logger.info(f"Transaction hash type: {type(tx_hash)}")
+            tx_hash = _sign_and_send_transaction(web3, swap_tx, account)
 
-            # Wait for receipt using the original tx_hash object
-            logger.info("Waiting for transaction receipt...")
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            if approve_tx_hash is None:
+                logger.info("Waiting for transaction receipt...")
+                receipt = _wait_for_receipt(web3, tx_hash, sender=account.address)
+            else:
+                # Both transactions are in flight, so wait for their receipts concurrently
+                logger.info("Waiting for approval and swap transaction receipts...")
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    approve_future = executor.submit(_wait_for_receipt, web3, approve_tx_hash, sender=account.address)
+                    swap_future = executor.submit(_wait_for_receipt, web3, tx_hash, sender=account.address)
+                    approve_receipt = approve_future.result()
+                    receipt = swap_future.result()
+                logger.info(f"Approval transaction confirmed: status={approve_receipt.status}")
+                
+                if approve_receipt.status != 1:
+                    logger.error("Approval transaction failed")
+                    return {
+                        "error": "Approval transaction failed",
+                        "tx_hash": web3.to_hex(approve_tx_hash),
+                        "swap_tx_hash": web3.to_hex(tx_hash),
+                        "status": "error"
+                    }
+                _infinite_approvals.add(approval_key)
+            
+            if receipt.status != 1:
+                # The allowance may have been revoked or lowered outside the app, and the cached gas
+                # limit may have been too low, so check both again next time
+                _infinite_approvals.discard(approval_key)
+                _gas_limit_cache.pop(swap_gas_key, None)
+                logger.error("Swap transaction failed")
+                return {
+                    "error": "Swap transaction failed",
+                    "tx_hash": web3.to_hex(tx_hash),
+                    "status": "error"
+                }
             
             logger.info("Swap completed successfully")
             return {
@@ -865,7 +1517,7 @@ def get_user_positions():
         
         # Get position manager contract
         nft_manager_address = SPARKDEX_CONTRACTS["nonfungiblePositionManager"]
-        nft_manager_contract = _get_contract(nft_manager_address)
+        nft_manager_contract = _get_contract(nft_manager_address, "nonfungible_position_manager_abi")
         
         if not nft_manager_contract:
             return {
@@ -874,24 +1526,32 @@ def get_user_positions():
             }
         
         # Get Web3 connection
-        connection = get_evm_connection()
-        if not connection or not connection.connected:
+        web3 = _get_web3()
+        if web3 is None:
             return {
                 "error": "Failed to connect to Ethereum node",
                 "status": "error"
             }
         
-        web3 = connection.web3
-        
         # Get user's token balance
         try:
-            balance = nft_manager_contract.functions.balanceOf(user_address).call()
+            balance = _raw_call(web3, _hot_call(nft_manager_address, 'balanceOf(address)', user_address))
+            
+            # Resolve all token IDs in one multicall, then all positions in a second one.
+            # Enumeration is deliberate: deriving ownership from Transfer logs would mean scanning
+            # from the manager's deployment block, and Flare RPC nodes cap eth_getLogs to small
+            # block ranges, so that takes far more requests than these three calls.
+            token_ids = _multicall3([
+                _hot_call(nft_manager_address, 'tokenOfOwnerByIndex(address,uint256)', user_address, i)
+                for i in range(balance)
+            ])
+            position_data = _multicall3([
+                _hot_call(nft_manager_address, 'positions(uint256)', token_id)
+                for token_id in token_ids
+            ])
             
             positions = []
-            for i in range(balance):
-                token_id = nft_manager_contract.functions.tokenOfOwnerByIndex(user_address, i).call()
-                position = nft_manager_contract.functions.positions(token_id).call()
-                
+            for token_id, position in zip(token_ids, position_data):
                 positions.append({
                     "token_id": token_id,
                     "token0": position[2],
@@ -951,10 +1611,13 @@ def get_perp_positions():
         try:
             # This is a placeholder - actual method depends on the contract implementation
             positions_count = position_manager_contract.functions.getUserPositionsCount(user_address).call()
-            positions = []
+            position_data = _multicall3([
+                position_manager_contract.functions.getUserPosition(user_address, i)
+                for i in range(positions_count)
+            ])
             
-            for i in range(positions_count):
-                position_info = position_manager_contract.functions.getUserPosition(user_address, i).call()
+            positions = []
+            for i, position_info in enumerate(position_data):
                 positions.append({
                     "index": i,
                     "market": position_info[0],
@@ -995,6 +1658,15 @@ def get_detailed_pool_data(pool_address: str):
         A dictionary containing detailed information about the pool
     """
     try:
+        # Validate the pool address
+        try:
+            pool_address = _to_checksum_address(pool_address)
+        except ValueError:
+            return {
+                "error": f"Invalid pool address: {pool_address}",
+                "status": "error"
+            }
+        
         # Get pool contract
         pool_contract = _get_contract(pool_address, "v3_pool_abi")
         if not pool_contract:
@@ -1003,38 +1675,26 @@ def get_detailed_pool_data(pool_address: str):
                 "status": "error"
             }
         
-        # Get basic pool information
-        token0 = pool_contract.functions.token0().call()
-        token1 = pool_contract.functions.token1().call()
-        fee = pool_contract.functions.fee().call()
-        
-        # Get token contracts
-        token0_contract = _get_contract(token0)
-        token1_contract = _get_contract(token1)
+        # Get pool information and state (at most a single round-trip)
+        (token0, token1, fee, _, _), (slot0, liquidity, feeGrowthGlobal0X128, feeGrowthGlobal1X128) = \
+            _get_pool_state(pool_contract.address)
         
-        # Get token information
-        token0_symbol = token0_contract.functions.symbol().call() if token0_contract else "Unknown"
-        token1_symbol = token1_contract.functions.symbol().call() if token1_contract else "Unknown"
-        token0_decimals = token0_contract.functions.decimals().call() if token0_contract else 18
-        token1_decimals = token1_contract.functions.decimals().call() if token1_contract else 18
+        # Get token information (needs the token addresses, so it is a second round-trip when not cached)
+        ((_, token0_symbol, token0_decimals), (_, token1_symbol, token1_decimals)), _ = \
+            _get_erc20_metadata([token0, token1])
         
-        # Get pool state
-        slot0 = pool_contract.functions.slot0().call()
-        liquidity = pool_contract.functions.liquidity().call()
+        # Fall back to defaults for tokens that don't implement the optional ERC20 getters
+        token0_symbol = token0_symbol or "Unknown"
+        token1_symbol = token1_symbol or "Unknown"
+        token0_decimals = 18 if token0_decimals is None else token0_decimals
+        token1_decimals = 18 if token1_decimals is None else token1_decimals
         
         # Calculate current price
         sqrt_price_x96 = slot0[0]
         current_tick = slot0[1]
         
-        # Price = (sqrtPriceX96 / 2^96)^2
-        price_raw = (sqrt_price_x96 / (2**96))**2
-        
-        # Adjust for decimals
-        price = price_raw * (10 ** (token0_decimals - token1_decimals))
-        
-        # Get fee growth
-        feeGrowthGlobal0X128 = pool_contract.functions.feeGrowthGlobal0X128().call()
-        feeGrowthGlobal1X128 = pool_contract.functions.feeGrowthGlobal1X128().call()
+        # Price = sqrtPriceX96^2 / 2^192, adjusted for decimals
+        price = _price_from_sqrt_price_x96(sqrt_price_x96, token0_decimals - token1_decimals)
         
         return {
             "address": pool_address,
@@ -1066,57 +1726,51 @@ def get_detailed_pool_data(pool_address: str):
             "status": "error"
         }
 
-def get_token_info(token_address: str):
+def get_token_info(token_address: str, scale: bool = True):
     """
     Get information about an ERC20 token.
     
     Args:
         token_address: The address of the token contract
+        scale: If False, only the exact integer totalSupplyRaw is returned, without the
+            totalSupply / totalSupplyFloat token-unit values
         
     Returns:
         A dictionary containing information about the token
     """
     try:
-        # Get token contract using our ERC20 ABI
-        token_contract = _get_contract(token_address, load_abi('erc20'))
-        if not token_contract:
+        # Validate the token address
+        try:
+            token_address = _to_checksum_address(token_address)
+        except ValueError:
             return {
-                "error": f"Failed to get contract instance for token {token_address}",
+                "error": f"Invalid token address: {token_address}",
                 "status": "error"
             }
         
-        # Get token information
-        try:
-            name = token_contract.functions.name().call()
-        except Exception:
-            name = "Unknown"
-            
-        try:
-            symbol = token_contract.functions.symbol().call()
-        except Exception:
-            symbol = "Unknown"
-            
-        try:
-            decimals = token_contract.functions.decimals().call()
-        except Exception:
-            decimals = 18
-            
-        try:
-            total_supply_raw = token_contract.functions.totalSupply().call()
-            total_supply = total_supply_raw / (10 ** decimals)
-        except Exception:
+        # Get token information (cached) and the current supply in at most one multicall
+        [(name, symbol, decimals)], [total_supply_raw] = _get_erc20_metadata(
+            [token_address], [_hot_call(token_address, 'totalSupply()')]
+        )
+        
+        # Fall back to defaults for getters the token doesn't implement
+        name = name or "Unknown"
+        symbol = symbol or "Unknown"
+        decimals = 18 if decimals is None else decimals
+        if total_supply_raw is None:
             total_supply_raw = 0
-            total_supply = 0
         
-        return {
+        result = {
             "address": token_address,
             "name": name,
             "symbol": symbol,
             "decimals": decimals,
-            "totalSupply": total_supply,
             "totalSupplyRaw": total_supply_raw,
             "status": "success"
         }
+        if scale:
+            result["totalSupply"], result["totalSupplyFloat"] = _format_token_amount(total_supply_raw, decimals)
+        return result
     except Exception as e:
         error_msg = f"Error getting token info: {str(e)}"
         logger.error(error_msg)
@@ -1125,66 +1779,96 @@ def get_token_info(token_address: str):
             "status": "error"
         }
 
-def get_token_balance(token_address: str, wallet_address: str = None):
+def clear_token_metadata_cache():
+    """
+    Drop all cached ERC20 metadata, in memory and on disk.
+    
+    Token metadata is cached indefinitely; call this when a token's metadata may have changed, e.g.
+    after an upgradeable (proxy) token was upgraded.
+    """
+    with _cache_lock:
+        _erc20_metadata_cache.clear()
+    try:
+        with _metadata_db_lock:
+            db = _get_metadata_db()
+            with db:
+                db.execute("DELETE FROM erc20_meta")
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not clear cached ERC20 metadata: {str(e)}")
+
+def get_token_balance(token_address: str, wallet_address: str = None, scale: bool = True):
     """
     Get the token balance for a wallet address.
     
     Args:
         token_address: The address of the token contract
         wallet_address: The wallet address to check balance for (default: uses connected wallet)
+        scale: If False, only the exact integer balanceRaw is returned, without the
+            balance / balanceFloat token-unit values
         
     Returns:
         A dictionary containing the token balance information
     """
     try:
         # Get Web3 connection
-        connection = get_evm_connection()
-        if not connection or not connection.connected:
+        web3 = _get_web3()
+        if web3 is None:
             return {
                 "error": "Failed to connect to Ethereum node",
                 "status": "error"
             }
         
-        web3 = connection.web3
-        
         # If no wallet address provided, use the connected account
         if not wallet_address:
-            accounts = web3.eth.accounts
-            if not accounts:
+            wallet_address = _get_node_account(web3)
+            if not wallet_address:
                 return {
                     "error": "No wallet address provided and no accounts available",
                     "status": "error"
                 }
-            wallet_address = accounts[0]
         
-        # Get token information first
-        token_info = get_token_info(token_address)
-        if token_info.get("status") != "success":
-            return token_info
+        # Validate addresses
+        try:
+            token_address = _to_checksum_address(token_address)
+        except ValueError:
+            return {
+                "error": f"Invalid token address: {token_address}",
+                "status": "error"
+            }
+        
+        try:
+            wallet_address = _to_checksum_address(wallet_address)
+        except ValueError:
+            return {
+                "error": f"Invalid wallet address: {wallet_address}",
+                "status": "error"
+            }
         
-        # Get token contract using our ERC20 ABI
-        token_contract = _get_contract(token_address, load_abi('erc20'))
-        if not token_contract:
+        # Get token information (cached) and the balance in a single multicall; the balance is
+        # the only read when the token has been seen before
+        [(name, symbol, decimals)], [balance_raw] = _get_erc20_metadata(
+            [token_address], [_hot_call(token_address, 'balanceOf(address)', wallet_address)]
+        )
+        if balance_raw is None:
             return {
-                "error": f"Failed to get contract instance for token {token_address}",
+                "error": f"Failed to get balance of {wallet_address} for token {token_address}",
                 "status": "error"
             }
         
-        # Get balance
-        balance_raw = token_contract.functions.balanceOf(wallet_address).call()
-        decimals = token_info.get("decimals", 18)
-        balance = balance_raw / (10 ** decimals)
+        decimals = 18 if decimals is None else decimals
         
-        return {
+        result = {
             "address": token_address,
             "wallet": wallet_address,
-            "name": token_info.get("name"),
-            "symbol": token_info.get("symbol"),
+            "name": name or "Unknown",
+            "symbol": symbol or "Unknown",
             "decimals": decimals,
-            "balance": balance,
             "balanceRaw": balance_raw,
             "status": "success"
         }
+        if scale:
+            result["balance"], result["balanceFloat"] = _format_token_amount(balance_raw, decimals)
+        return result
     except Exception as e:
         error_msg = f"Error getting token balance: {str(e)}"
         logger.error(error_msg)
@@ -1193,6 +1877,72 @@ def get_token_balance(token_address: str, wallet_address: str = None):
             "status": "error"
         }
 
+def get_token_balances_batch(pairs: List[List[str]], scale: bool = True):
+    """
+    Get token balances for many (token, wallet) pairs at once.
+    
+    Every balanceOf read (plus the metadata of tokens not seen before) is sent through Multicall3,
+    so N pairs cost about N / 500 RPCs instead of N.
+    
+    Args:
+        pairs: The pairs to look up, each a two-element list of [token_address, wallet_address],
+            e.g. [["0xToken...", "0xWallet..."], ["0xToken...", "0xOtherWallet..."]]
+        scale: If False, only the exact integer balanceRaw is returned for each pair, without the
+            balance / balanceFloat token-unit values
+        
+    Returns:
+        A dictionary containing the balance information for each pair, in order
+    """
+    try:
+        # Validate addresses
+        checked_pairs = []
+        for pair in pairs:
+            try:
+                token_address, wallet_address = pair
+                checked_pairs.append((_to_checksum_address(token_address), _to_checksum_address(wallet_address)))
+            except (TypeError, ValueError):
+                return {
+                    "error": f"Invalid token/wallet pair: {pair}",
+                    "status": "error"
+                }
+        
+        # Token metadata is fetched once per token, however many wallets hold it
+        tokens = list(dict.fromkeys(token for token, _ in checked_pairs))
+        metadata, balances_raw = _get_erc20_metadata(tokens, [
+            _hot_call(token_address, 'balanceOf(address)', wallet_address)
+            for token_address, wallet_address in checked_pairs
+        ])
+        metadata = dict(zip(tokens, metadata))
+        
+        balances = []
+        for (token_address, wallet_address), balance_raw in zip(checked_pairs, balances_raw):
+            _, symbol, decimals = metadata[token_address]
+            decimals = 18 if decimals is None else decimals
+            # balanceRaw is None when the balance couldn't be read (e.g. not an ERC20 contract)
+            entry = {
+                "address": token_address,
+                "wallet": wallet_address,
+                "symbol": symbol or "Unknown",
+                "decimals": decimals,
+                "balanceRaw": balance_raw
+            }
+            if scale:
+                entry["balance"], entry["balanceFloat"] = (None, None) if balance_raw is None else \
+                    _format_token_amount(balance_raw, decimals)
+            balances.append(entry)
+        
+        return {
+            "balances": balances,
+            "status": "success"
+        }
+    except Exception as e:
+        error_msg = f"Error getting token balances: {str(e)}"
+        logger.error(error_msg)
+        return {
+            "error": error_msg,
+            "status": "error"
+        }
+
 def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount1: str, 
                  fee: int = 3000, tick_lower: int = None, tick_upper: int = None, 
                  slippage: float = 0.5, private_key: str = None):
@@ -1215,13 +1965,17 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
     """
     try:
         # Validate addresses
-        if not Web3.is_address(token0_address):
+        try:
+            token0_address = _to_checksum_address(token0_address)
+        except ValueError:
             return {
                 "error": f"Invalid token0 address: {token0_address}",
                 "status": "error"
             }
         
-        if not Web3.is_address(token1_address):
+        try:
+            token1_address = _to_checksum_address(token1_address)
+        except ValueError:
             return {
                 "error": f"Invalid token1 address: {token1_address}",
                 "status": "error"
@@ -1236,21 +1990,20 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
             }
         
         # Get Web3 connection
-        connection = get_evm_connection()
-        if not connection or not connection.connected:
+        web3 = _get_web3()
+        if web3 is None:
             return {
                 "error": "Failed to connect to Ethereum node",
                 "status": "error"
             }
         
-        web3 = connection.web3
-        
-        # Ensure PoA middleware is added
-        _ensure_poa_middleware(web3)
+        # Fee fields and chain ID are shared by every transaction sent below
+        fee_params = _prepare_transactions(web3, from_address)
+        chain_id = get_evm_connection().get_chain_id()
         
         # Get position manager contract
         nft_manager_address = SPARKDEX_CONTRACTS["nonfungiblePositionManager"]
-        nft_manager_contract = _get_contract(nft_manager_address)
+        nft_manager_contract = _get_contract(nft_manager_address, "nonfungible_position_manager_abi")
         
         if not nft_manager_contract:
             return {
@@ -1259,24 +2012,27 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
             }
         
         # Get token contracts
-        token0_contract = _get_contract(token0_address)
+        token0_contract = _get_contract(token0_address, "erc20")
         if not token0_contract:
             return {
                 "error": f"Failed to get contract instance for {token0_address}",
                 "status": "error"
             }
         
-        token1_contract = _get_contract(token1_address)
+        token1_contract = _get_contract(token1_address, "erc20")
         if not token1_contract:
             return {
                 "error": f"Failed to get contract instance for {token1_address}",
                 "status": "error"
             }
         
-        # Get token decimals
+        # Get token decimals (cached per token, both uncached ones in one multicall)
         try:
-            token0_decimals = token0_contract.functions.decimals().call()
-            token1_decimals = token1_contract.functions.decimals().call()
+            [(_, _, token0_decimals), (_, _, token1_decimals)], _ = _get_erc20_metadata(
+                [token0_contract.address, token1_contract.address]
+            )
+            if token0_decimals is None or token1_decimals is None:
+                raise ValueError("decimals() call failed")
             
             amount0_wei = int(float(amount0) * 10**token0_decimals)
             amount1_wei = int(float(amount1) * 10**token1_decimals)
@@ -1310,15 +2066,14 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
                     fee
                 ).build_transaction({
                     'from': from_address,
-                    'nonce': web3.eth.get_transaction_count(from_address),
                     'gas': 3000000,
-                    'gasPrice': web3.eth.gas_price,
-                    'chainId': web3.eth.chain_id
+                    'chainId': chain_id,
+                    **fee_params
                 })
                 
                 # Sign and send transaction using our helper function
                 tx_hash = _sign_and_send_transaction(web3, create_pool_tx, account)
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = _wait_for_receipt(web3, tx_hash, sender=account.address)
                 
                 # Get the pool address from the event logs or call getPool again
                 pool_address = factory_contract.functions.getPool(token0_address, token1_address, fee).call()
@@ -1337,39 +2092,36 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
                 # Calculate initial sqrt price (assuming 1:1 for simplicity)
                 # In a real implementation, you would want to use a more accurate initial price
                 initial_price = 1.0  # 1 token0 = 1 token1
-                sqrt_price_x96 = int((initial_price ** 0.5) * (2 ** 96))
+                sqrt_price_x96 = _sqrt_price_x96_from_price(initial_price)
                 
                 # Initialize pool
                 init_tx = pool_contract.functions.initialize(sqrt_price_x96).build_transaction({
                     'from': from_address,
-                    'nonce': web3.eth.get_transaction_count(from_address),
                     'gas': 200000,
-                    'gasPrice': web3.eth.gas_price,
-                    'chainId': web3.eth.chain_id
+                    'chainId': chain_id,
+                    **fee_params
                 })
                 
                 # Sign and send transaction using our helper function
                 tx_hash = _sign_and_send_transaction(web3, init_tx, account)
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = _wait_for_receipt(web3, tx_hash, sender=account.address)
                 
                 logger.info(f"Pool initialized with sqrt price {sqrt_price_x96}")
             
-            # Get pool information to determine ticks if not provided
-            pool_contract = _get_contract(pool_address)
-            if not pool_contract:
-                return {
-                    "error": f"Failed to get contract instance for pool {pool_address}",
-                    "status": "error"
-                }
-            
-            # Get current tick from pool
-            slot0 = pool_contract.functions.slot0().call()
-            current_tick = slot0[1]
-            
             # If tick range not provided, use a standard range around the current tick
             if tick_lower is None or tick_upper is None:
-                # Get tick spacing for this fee tier
-                tick_spacing = factory_contract.functions.feeAmountTickSpacing(fee).call()
+                # Get the current tick from the pool and, unless cached, the tick spacing for
+                # this fee tier, in one multicall
+                tick_spacing = _fee_tick_spacings.get(fee)
+                tick_calls = [_hot_call(_to_checksum_address(pool_address), 'slot0()')]
+                if tick_spacing is None:
+                    tick_calls.append(factory_contract.functions.feeAmountTickSpacing(fee))
+                slot0, *fetched_spacing = _multicall3(tick_calls)
+                current_tick = slot0[1]
+                if fetched_spacing:
+                    tick_spacing = fetched_spacing[0]
+                    if tick_spacing:
+                        _fee_tick_spacings[fee] = tick_spacing
                 
                 # Set a range of ±10% around the current price (simplified)
                 # In a real implementation, you would want to use a more sophisticated approach
@@ -1383,13 +2135,37 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
                     # Ensure tick_upper is a multiple of tick_spacing
                     tick_upper = tick_upper - (tick_upper % tick_spacing)
             
-            # Check allowances and approve if needed
-            for token_address, token_contract, amount_wei in [
-                (token0_address, token0_contract, amount0_wei),
-                (token1_address, token1_contract, amount1_wei)
-            ]:
+            # Check allowances and approve if needed. Approvals aren't waited for one by one: they
+            # and the mint are sent back-to-back with consecutive nonces, so the node executes them
+            # in order, and their receipts are awaited together below.
+            # Tokens with no amount, or already known to have an unlimited allowance, are skipped
+            # without reading the allowance at all.
+            approve_tx_hashes = []
+            approval_keys = []
+            tokens_to_approve = [
+                (token_address, token_contract, amount_wei)
+                for token_address, token_contract, amount_wei in [
+                    (token0_address, token0_contract, amount0_wei),
+                    (token1_address, token1_contract, amount1_wei)
+                ]
+                if amount_wei > 0
+                and (from_address, token_contract.address, nft_manager_address) not in _infinite_approvals
+            ]
+            try:
+                allowances = _multicall3([
+                    _hot_call(token_contract.address, 'allowance(address,address)', from_address, nft_manager_address)
+                    for _, token_contract, _ in tokens_to_approve
+                ]) if tokens_to_approve else []
+            except Exception as e:
+                return {
+                    "error": f"Error checking allowances: {str(e)}",
+                    "status": "error"
+                }
+            for (token_address, token_contract, amount_wei), allowance in zip(tokens_to_approve, allowances):
+                approval_key = (from_address, token_contract.address, nft_manager_address)
+                if allowance >= _UNLIMITED_ALLOWANCE:
+                    _infinite_approvals.add(approval_key)
                 try:
-                    allowance = token_contract.functions.allowance(from_address, nft_manager_address).call()
                     if allowance < amount_wei:
                         # Approve position manager to spend tokens
                         approve_tx = token_contract.functions.approve(
@@ -1397,17 +2173,17 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
                             2**256 - 1  # Max uint256 value
                         ).build_transaction({
                             'from': from_address,
-                            'nonce': web3.eth.get_transaction_count(from_address),
                             'gas': 100000,
-                            'gasPrice': web3.eth.gas_price,
-                            'chainId': web3.eth.chain_id
+                            'chainId': chain_id,
+                            **fee_params
                         })
                         
                         # Sign and send approval transaction using our helper function
                         tx_hash = _sign_and_send_transaction(web3, approve_tx, account)
-                        web3.eth.wait_for_transaction_receipt(tx_hash)
+                        approve_tx_hashes.append(tx_hash)
+                        approval_keys.append(approval_key)
                         
-                        logger.info(f"Approved position manager to spend {token_address}: {web3.to_hex(tx_hash)}")
+                        logger.info(f"Approval for position manager to spend {token_address} sent: {web3.to_hex(tx_hash)}")
                 except Exception as e:
                     return {
                         "error": f"Error approving tokens: {str(e)}",
@@ -1419,7 +2195,7 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
             amount1_min = int(amount1_wei * (1 - slippage / 100))
             
             # Current timestamp plus 20 minutes
-            deadline = web3.eth.get_block('latest').timestamp + 1200
+            deadline = int(time.time()) + 1200
             
             # Build mint transaction
             mint_params = {
@@ -1438,33 +2214,60 @@ def add_liquidity(token0_address: str, token1_address: str, amount0: str, amount
             
             mint_tx = nft_manager_contract.functions.mint(mint_params).build_transaction({
                 'from': from_address,
-                'nonce': web3.eth.get_transaction_count(from_address),
                 'gas': 500000,
-                'gasPrice': web3.eth.gas_price,
-                'chainId': web3.eth.chain_id
+                'chainId': chain_id,
+                **fee_params
             })
             
             # Sign and send mint transaction using our helper function
             tx_hash = _sign_and_send_transaction(web3, mint_tx, account)
             logger.info(f"Mint transaction sent: {web3.to_hex(tx_hash)}")
             
-            # Wait for receipt to get token ID
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            # Wait for receipt to get token ID, and for any approvals concurrently with it
+            if not approve_tx_hashes:
+                receipt = _wait_for_receipt(web3, tx_hash, sender=account.address)
+            else:
+                with ThreadPoolExecutor(max_workers=len(approve_tx_hashes) + 1) as executor:
+                    approve_futures = [
+                        executor.submit(_wait_for_receipt, web3, approve_tx_hash, sender=account.address)
+                        for approve_tx_hash in approve_tx_hashes
+                    ]
+                    mint_future = executor.submit(_wait_for_receipt, web3, tx_hash, sender=account.address)
+                    approve_receipts = [future.result() for future in approve_futures]
+                    receipt = mint_future.result()
+                
+                for approve_tx_hash, approve_receipt, approval_key in zip(
+                    approve_tx_hashes, approve_receipts, approval_keys
+                ):
+                    if approve_receipt.status != 1:
+                        logger.error("Approval transaction failed")
+                        return {
+                            "error": "Approval transaction failed",
+                            "tx_hash": web3.to_hex(approve_tx_hash),
+                            "mint_tx_hash": web3.to_hex(tx_hash),
+                            "status": "error"
+                        }
+                    _infinite_approvals.add(approval_key)
+            
+            if receipt.status != 1:
+                # The allowances may have been revoked or lowered outside the app, so check them again next time
+                for token_contract in (token0_contract, token1_contract):
+                    _infinite_approvals.discard((from_address, token_contract.address, nft_manager_address))
+                logger.error("Mint transaction failed")
+                return {
+                    "error": "Mint transaction failed",
+                    "tx_hash": web3.to_hex(tx_hash),
+                    "status": "error"
+                }
             
             # Try to extract token ID from event logs
+            # tokenId is the event's first indexed argument, so it is read straight from the topics
             token_id = None
             for log in receipt.logs:
-                if log['address'].lower() == nft_manager_address.lower():
-                    # This is a simplified approach - in a real implementation, 
-                    # you would want to decode the event data properly
-                    try:
-                        # Get the IncreaseLiquidity event
-                        event_signature = web3.keccak(text="IncreaseLiquidity(uint256,uint128,uint256,uint256)").hex()
-                        if log['topics'][0].hex() == event_signature:
-                            token_id = int(log['topics'][1].hex(), 16)
-                            break
-                    except Exception:
-                        pass
+                topics = log['topics']
+                if log['address'] == nft_manager_address and topics and topics[0] == _INCREASE_LIQUIDITY_TOPIC:
+                    token_id = int.from_bytes(topics[1], 'big')
+                    break
             
             return {
                 "transaction_hash": web3.to_hex(tx_hash),
@@ -1510,13 +2313,17 @@ def create_pool(token0_address: str, token1_address: str, fee: int = 3000, initi
     """
     try:
         # Validate addresses
-        if not Web3.is_address(token0_address):
+        try:
+            token0_address = _to_checksum_address(token0_address)
+        except ValueError:
             return {
                 "error": f"Invalid token0 address: {token0_address}",
                 "status": "error"
             }
         
-        if not Web3.is_address(token1_address):
+        try:
+            token1_address = _to_checksum_address(token1_address)
+        except ValueError:
             return {
                 "error": f"Invalid token1 address: {token1_address}",
                 "status": "error"
@@ -1531,17 +2338,16 @@ def create_pool(token0_address: str, token1_address: str, fee: int = 3000, initi
             }
         
         # Get Web3 connection
-        connection = get_evm_connection()
-        if not connection or not connection.connected:
+        web3 = _get_web3()
+        if web3 is None:
             return {
                 "error": "Failed to connect to Ethereum node",
                 "status": "error"
             }
         
-        web3 = connection.web3
-        
-        # Ensure PoA middleware is added
-        _ensure_poa_middleware(web3)
+        # Fee fields and chain ID are shared by every transaction sent below
+        fee_params = _prepare_transactions(web3, from_address)
+        chain_id = get_evm_connection().get_chain_id()
         
         # Get factory contract
         factory_address = SPARKDEX_CONTRACTS["v3Factory"]
@@ -1571,15 +2377,14 @@ def create_pool(token0_address: str, token1_address: str, fee: int = 3000, initi
                 fee
             ).build_transaction({
                 'from': from_address,
-                'nonce': web3.eth.get_transaction_count(from_address),
                 'gas': 3000000,
-                'gasPrice': web3.eth.gas_price,
-                'chainId': web3.eth.chain_id
+                'chainId': chain_id,
+                **fee_params
             })
             
             # Sign and send transaction using our helper function
             tx_hash = _sign_and_send_transaction(web3, create_pool_tx, account)
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = _wait_for_receipt(web3, tx_hash, sender=account.address)
             
             # Get the pool address
             pool_address = factory_contract.functions.getPool(token0_address, token1_address, fee).call()
@@ -1597,29 +2402,26 @@ def create_pool(token0_address: str, token1_address: str, fee: int = 3000, initi
             
             # Calculate sqrt price
             # sqrtPriceX96 = sqrt(price) * 2^96
-            sqrt_price_x96 = int((initial_price ** 0.5) * (2 ** 96))
+            sqrt_price_x96 = _sqrt_price_x96_from_price(initial_price)
             
             # Initialize pool
             init_tx = pool_contract.functions.initialize(sqrt_price_x96).build_transaction({
                 'from': from_address,
-                'nonce': web3.eth.get_transaction_count(from_address),
                 'gas': 200000,
-                'gasPrice': web3.eth.gas_price,
-                'chainId': web3.eth.chain_id
+                'chainId': chain_id,
+                **fee_params
             })
             
             # Sign and send transaction using our helper function
             tx_hash = _sign_and_send_transaction(web3, init_tx, account)
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = _wait_for_receipt(web3, tx_hash, sender=account.address)
             
             logger.info(f"Pool initialized with sqrt price {sqrt_price_x96}")
             
             # Get token information
-            token0_contract = _get_contract(token0_address)
-            token1_contract = _get_contract(token1_address)
-            
-            token0_symbol = token0_contract.functions.symbol().call() if token0_contract else "Unknown"
-            token1_symbol = token1_contract.functions.symbol().call() if token1_contract else "Unknown"
+            [(_, token0_symbol, _), (_, token1_symbol, _)], _ = _get_erc20_metadata([token0_address, token1_address])
+            token0_symbol = token0_symbol or "Unknown"
+            token1_symbol = token1_symbol or "Unknown"
             
             return {
                 "transaction_hash": web3.to_hex(tx_hash),
@@ -1664,69 +2466,31 @@ def get_pool_details_by_address(pool_address: str) -> dict:
     """
     try:
         # Validate the pool address
-        if not Web3.is_address(pool_address):
+        try:
+            pool_address = _to_checksum_address(pool_address)
+        except ValueError:
             return {"error": f"Invalid pool address format: {pool_address}"}
         
-        # Get the pool contract
-        pool_contract = _get_contract(pool_address, "v3_pool_abi")
-        
-        if not pool_contract:
-            return {"error": f"Could not get contract instance for pool: {pool_address}"}
-        
-        # Get basic pool information
-        token0_address = pool_contract.functions.token0().call()
-        token1_address = pool_contract.functions.token1().call()
-        fee = pool_contract.functions.fee().call()
-        liquidity = pool_contract.functions.liquidity().call()
-        tick_spacing = pool_contract.functions.tickSpacing().call()
-        factory_address = pool_contract.functions.factory().call()
-        
-        # Get slot0 data which contains current price and tick
-        slot0_data = pool_contract.functions.slot0().call()
+        # Get basic pool information and slot0 (current price and tick), at most a single multicall
+        (token0_address, token1_address, fee, tick_spacing, factory_address), (slot0_data, liquidity, _, _) = \
+            _get_pool_state(pool_address)
         sqrt_price_x96 = slot0_data[0]
         current_tick = slot0_data[1]
         
-        # Get token information
-        token0_contract = _get_contract(token0_address, "erc20")
-        token1_contract = _get_contract(token1_address, "erc20")
-        
-        # Try to get token symbols from our dictionary first
-        token0_symbol = get_token_by_address(token0_address) or "Unknown"
-        token1_symbol = get_token_by_address(token1_address) or "Unknown"
-        
-        # Get token decimals from our dictionary or from the contract
-        token0_decimals = 18
-        token1_decimals = 18
-        
-        # Try to get decimals from our dictionary first
-        if token0_symbol != "Unknown" and token0_symbol in TOKEN_INFO:
-            token0_decimals = TOKEN_INFO[token0_symbol]["decimals"]
-        elif token0_contract:
-            try:
-                token0_decimals = token0_contract.functions.decimals().call()
-            except Exception as e:
-                logging.error(f"Error getting token0 decimals: {e}")
-        
-        if token1_symbol != "Unknown" and token1_symbol in TOKEN_INFO:
-            token1_decimals = TOKEN_INFO[token1_symbol]["decimals"]
-        elif token1_contract:
-            try:
-                token1_decimals = token1_contract.functions.decimals().call()
-            except Exception as e:
-                logging.error(f"Error getting token1 decimals: {e}")
-        
-        # If we still don't have symbols, try to get them from the contract
-        if token0_symbol == "Unknown" and token0_contract:
-            try:
-                token0_symbol = token0_contract.functions.symbol().call()
-            except Exception as e:
-                logging.error(f"Error getting token0 symbol: {e}")
-        
-        if token1_symbol == "Unknown" and token1_contract:
-            try:
-                token1_symbol = token1_contract.functions.symbol().call()
-            except Exception as e:
-                logging.error(f"Error getting token1 symbol: {e}")
+        # Get token symbols and decimals: known tokens come from our dictionary, others from the
+        # metadata cache or, on first sight, a single multicall
+        try:
+            [(_, token0_symbol, token0_decimals), (_, token1_symbol, token1_decimals)], _ = _get_erc20_metadata(
+                [token0_address, token1_address]
+            )
+        except Exception as e:
+            logging.error(f"Error getting token metadata: {e}")
+            token0_symbol = token1_symbol = token0_decimals = token1_decimals = None
+        token0_symbol = token0_symbol or "Unknown"
+        token1_symbol = token1_symbol or "Unknown"
+        # Default to 18 decimals if we can't get the actual value
+        token0_decimals = 18 if token0_decimals is None else token0_decimals
+        token1_decimals = 18 if token1_decimals is None else token1_decimals
         
         # Calculate the price in token terms
         price = calculate_price_from_sqrt_price_x96(sqrt_price_x96, token0_decimals, token1_decimals)
@@ -1786,6 +2550,41 @@ def get_pool_details_by_address(pool_address: str) -> dict:
         logging.error(f"Error in get_pool_details_by_address: {e}")
         return {"error": f"Failed to get pool details: {str(e)}"}
 
+def _format_token_amount(raw_amount, decimals):
+    """
+    Convert a raw token amount to token units.
+    
+    Scaling is done exactly on a Decimal (it only shifts the exponent), so large amounts such
+    as 18-decimal supplies don't lose precision the way raw / 10**decimals does above 2**53.
+    
+    Returns:
+        The exact amount as a plain decimal string, and the amount as a float
+    """
+    amount = Decimal(raw_amount).scaleb(-decimals, _EXACT_CONTEXT)
+    return format(amount.normalize(_EXACT_CONTEXT), 'f'), float(amount)
+
+def _price_from_sqrt_price_x96(sqrt_price_x96, decimals_shift=0):
+    """
+    Convert a V3 sqrtPriceX96 to a price, scaled by 10**decimals_shift.
+    
+    The square is taken on the exact integer and divided as a Decimal, so there is no
+    float rounding until the final conversion.
+    """
+    price = Decimal(sqrt_price_x96 * sqrt_price_x96) / _Q192_DECIMAL
+    if decimals_shift:
+        price = price.scaleb(decimals_shift)
+    return float(price)
+
+def _sqrt_price_x96_from_price(price):
+    """
+    Convert a price to the sqrtPriceX96 a V3 pool is initialized with.
+    
+    The price is taken as the exact ratio of its float value and the root is an integer
+    square root, so e.g. a price of 1 gives exactly 2**96 with no float rounding.
+    """
+    numerator, denominator = float(price).as_integer_ratio()
+    return math.isqrt((numerator << 192) // denominator)
+
 def calculate_price_from_sqrt_price_x96(sqrt_price_x96: int, token0_decimals: int, token1_decimals: int) -> float:
     """
     Calculate the price from sqrtPriceX96 value.
@@ -1799,95 +2598,197 @@ def calculate_price_from_sqrt_price_x96(sqrt_price_x96: int, token0_decimals: in
         float: The price of token0 in terms of token1
     """
     try:
-        # Convert to decimal for precision
-        sqrt_price = Decimal(sqrt_price_x96) / Decimal(2**96)
-        price = sqrt_price * sqrt_price
-        
-        # Adjust for token decimals
-        decimal_adjustment = Decimal(10**(token1_decimals - token0_decimals))
-        adjusted_price = price * decimal_adjustment
-        
-        return float(adjusted_price)
+        return _price_from_sqrt_price_x96(sqrt_price_x96, token1_decimals - token0_decimals)
     except Exception as e:
         logging.error(f"Error calculating price: {e}")
         return 0
 
-def _sign_and_send_transaction(web3, tx, account):
-    """Sign and send a transaction."""
+# Receipt polling: Flare produces a block roughly every 1.8s and a sent transaction usually lands
+# in the next one, so poll quickly while that block is due and back off once it has been missed
+_RECEIPT_FAST_POLL_INTERVAL = 0.2
+_RECEIPT_FAST_POLL_WINDOW = 3
+_RECEIPT_POLL_INTERVAL = 1
+_RECEIPT_TIMEOUT = 120
+
+# Gas limits estimated once per kind of transaction (e.g. a swap through one pool), with headroom
+# for the mild variation in gas used as pool state changes
+_gas_limit_cache = {}
+_GAS_LIMIT_MARGIN = 1.2
+# Swaps that cross more ticks use more gas, so swap estimates are also keyed on the amount's
+# power-of-two size and never go below this floor, which covers a swap crossing a few ticks
+_SWAP_GAS_FLOOR = 300000
+
+def _get_fee_params(web3, fee_history=None):
+    """
+    Get the fee fields for a transaction from a single eth_feeHistory call.
+    
+    Args:
+        web3: The Web3 instance to use
+        fee_history: An already fetched fee_history(5, 'latest', [50]) result (optional)
+        
+    Returns:
+        EIP-1559 maxFeePerGas/maxPriorityFeePerGas fields, or a legacy gasPrice field
+        if the node doesn't support fee history
+    """
     try:
-        logger.info("Starting inline transaction signing process")
-        try:
-            # Log transaction details
-            logger.info(f"Transaction to sign: gas={tx.get('gas')}, nonce={tx.get('nonce')}")
-            logger.info(f"Transaction destination: {tx.get('to')}")
-            
-            # Ensure POA middleware is added
-            logger.debug("Ensuring POA middleware is added")
-            if ExtraDataToPOAMiddleware not in web3.middleware_onion:
-                web3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
-                logger.debug("Added POA middleware")
-            
-            # Log account details (safely)
-            logger.info(f"Signing with account: {account.address}")
-            
-            # Sign the transaction
-            logger.info("Signing transaction...")
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key=account.key)
-            logger.info("Transaction signed successfully")
-            
-            # Send the transaction
-            logger.info("Sending raw transaction to network...")
-            if hasattr(signed_tx, 'raw_transaction'):
-                logger.debug("Using raw_transaction attribute (newer Web3.py)")
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            elif hasattr(signed_tx, 'rawTransaction'):
-                logger.debug("Using rawTransaction attribute (older Web3.py)")
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            else:
-                error_msg = "Cannot find raw transaction data in signed transaction"
-                logger.error(error_msg)
-                raise Exception(error_msg)
-            
-            logger.info(f"Raw transaction sent successfully with hash: {tx_hash.hex()}")
-            
-            # Don't convert to hex string here - keep the original tx_hash object
-            # This should avoid the type conversion issue
-            
-        except Exception as e:
-            error_msg = f"Error in inline transaction signing/sending: {str(e)}"
-            logger.error(error_msg)
-            
-            # Log more details about the transaction that failed
-            try:
-                logger.error("Transaction that failed:")
-                for key, value in tx.items():
-                    logger.error(f"  {key}: {value}")
-            except:
-                logger.error("Could not log transaction details")
-            
-            raise Exception(error_msg)
+        if fee_history is None:
+            fee_history = web3.eth.fee_history(5, 'latest', [50])
+        # The last entry is the base fee of the next (pending) block
+        base_fee = fee_history['baseFeePerGas'][-1]
+        if not base_fee:
+            raise ValueError("Node reported no base fee")
+        
+        # Median of the 50th percentile tips over the last few blocks
+        rewards = sorted(reward[0] for reward in fee_history.get('reward', []) if reward)
+        priority_fee = rewards[len(rewards) // 2] if rewards else 0
+        
+        return {
+            # Leave headroom for the base fee to double before the transaction is mined
+            'maxFeePerGas': 2 * base_fee + priority_fee,
+            'maxPriorityFeePerGas': priority_fee
+        }
+    except Exception as e:
+        logger.warning(f"Fee history unavailable, using legacy gas price: {str(e)}")
+        return {'gasPrice': web3.eth.gas_price}
+
+def _prepare_transactions(web3, address):
+    """
+    Get the fee fields for transactions from an address, syncing its nonce in the same round-trip.
+    
+    The fee history and the pending transaction count are fetched as one JSON-RPC batch, and the
+    tracked nonce is reconciled with the pending count (see _sync_nonce) in case transactions were
+    sent from elsewhere or dropped; the chain ID comes from the connection's cached value.
+    
+    Args:
+        web3: The Web3 instance to use
+        address: The sender address
+        
+    Returns:
+        The fee fields, as returned by _get_fee_params
+    """
+    try:
+        fee_history, pending_count = batch_calls(web3, [
+            lambda: web3.eth.fee_history(5, 'latest', [50]),
+            lambda: web3.eth.get_transaction_count(address, 'pending')
+        ])
+    except Exception as e:
+        # e.g. no fee history support; fetch the fees on their own and re-read the nonce on first use
+        logger.warning(f"Could not batch transaction parameters: {str(e)}")
+        _reset_nonce(address)
+        return _get_fee_params(web3)
+    
+    _sync_nonce(address, pending_count)
+    return _get_fee_params(web3, fee_history)
+
+def _cached_gas_limit(key, estimate, default, floor=0):
+    """
+    Get the gas limit for a kind of transaction, estimating it the first time it is seen.
+    
+    Args:
+        key: Identifies the kind of transaction, e.g. ('approve', token, spender)
+        estimate: Callable returning a gas estimate, or None if the transaction can't be estimated yet
+        default: Gas limit to use when there's no cached estimate and estimating isn't possible or fails
+        floor: Minimum gas limit to use for an estimate
+        
+    Returns:
+        int: The gas limit to use
+    """
+    gas_limit = _gas_limit_cache.get(key)
+    if gas_limit is not None:
+        return gas_limit
+    if estimate is None:
+        return default
+    try:
+        gas_limit = max(int(estimate() * _GAS_LIMIT_MARGIN), floor)
+    except Exception as e:
+        logger.warning(f"Gas estimation failed for {key}, using default {default}: {str(e)}")
+        return default
+    _gas_limit_cache[key] = gas_limit
+    return gas_limit
+
+def _wait_for_receipt(web3, tx_hash, timeout=_RECEIPT_TIMEOUT, sender=None):
+    """
+    Wait for a transaction receipt, polling fast for the first few seconds and slower afterwards.
+    
+    Most transactions are included in the next block, so short polls there keep the time between
+    inclusion and noticing it low; a transaction that missed it is waiting on gas or the mempool,
+    where polling every 0.2s would only repeat requests that can't have changed.
+    
+    Args:
+        web3: The Web3 instance to use
+        tx_hash: The transaction hash
+        timeout: Seconds to wait before raising web3.exceptions.TimeExhausted
+        sender: The sending address; its tracked nonce is reset on a timeout, since the
+            transaction may have been dropped and left a gap
         
-        # Now continue with the original code, using tx_hash directly
-        logger.info(f"Transaction hash (for logging): {tx_hash.hex()}")
-        logger.info(f"Transaction hash type: {type(tx_hash)}")
+    Returns:
+        The transaction receipt
+    """
+    start = time.monotonic()
+    while True:
+        try:
+            return web3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            pass
+        elapsed = time.monotonic() - start
+        if elapsed >= timeout:
+            if sender is not None:
+                _reset_nonce(sender)
+            raise TimeExhausted(
+                f"Transaction {web3.to_hex(tx_hash)} is not in the chain after {timeout} seconds"
+            )
+        interval = _RECEIPT_FAST_POLL_INTERVAL if elapsed < _RECEIPT_FAST_POLL_WINDOW else _RECEIPT_POLL_INTERVAL
+        time.sleep(min(interval, timeout - elapsed))
 
-        # Wait for receipt using the original tx_hash object
-        logger.info("Waiting for transaction receipt...")
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+def _sign_and_send_transaction(web3, tx, account):
+    """
+    Sign and send a transaction.
+    
+    If the transaction has no nonce, the next locally tracked nonce for the account is used.
+    This doesn't wait for the receipt; callers wait for it when they need it.
+    
+    Args:
+        web3: The Web3 instance to use
+        tx: The transaction to sign
+        account: The account to sign with
+        
+    Returns:
+        The transaction hash
+    """
+    try:
+        if 'nonce' not in tx:
+            tx = {**tx, 'nonce': _next_nonce(web3, account.address)}
         
+        # Log transaction details
+        logger.info(f"Transaction to sign: gas={tx.get('gas')}, nonce={tx.get('nonce')}")
+        logger.info(f"Transaction destination: {tx.get('to')}")
+        
+        # Log account details (safely)
+        logger.info(f"Signing with account: {account.address}")
+        
+        # Sign the transaction
+        signed_tx = web3.eth.account.sign_transaction(tx, private_key=account.key)
+        
+        # Send the transaction
+        logger.info("Sending raw transaction to network...")
+        tx_hash = web3.eth.send_raw_transaction(_GET_RAW_TX(signed_tx))
+        
+        logger.info(f"Raw transaction sent successfully with hash: {tx_hash.hex()}")
         return tx_hash
         
     except Exception as e:
+        # The nonce wasn't consumed (or our count is stale), so re-read it next time
+        _reset_nonce(account.address)
+        
+        # A dropped connection means the cached Web3 instance is stale, so reconnect next time
+        if isinstance(e, (ConnectionError, HTTPConnectionError)):
+            _invalidate_web3()
+        
         error_msg = f"Error in inline transaction signing/sending: {str(e)}"
         logger.error(error_msg)
         
-        # Log more details about the transaction that failed
-        try:
-            logger.error("Transaction that failed:")
-            for key, value in tx.items():
-                logger.error(f"  {key}: {value}")
-        except:
-            logger.error("Could not log transaction details")
+        # Log the transaction that failed as a single record
+        logger.error(f"Transaction that failed: {tx}")
             
         raise Exception(error_msg)
 
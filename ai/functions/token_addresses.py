@@ -3,6 +3,13 @@ Token addresses for the Flare network.
 This file contains a dictionary of token addresses that can be used by the AI.
 """
 
+# Functions exposed to the AI function-calling layer
+__all__ = [
+    'get_token_address',
+    'get_token_info',
+    'get_token_by_address',
+]
+
 # Dictionary of token addresses on Flare network
 TOKEN_ADDRESSES = {
     # Main tokens
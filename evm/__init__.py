@@ -3,6 +3,6 @@ EVM Package
 This package provides functionality for interacting with EVM-compatible blockchains.
 """
 
-from evm.connection import initialize_evm_connection, get_evm_connection, EVMConnection
+from evm.connection import initialize_evm_connection, get_evm_connection, get_http_session, batch_calls, EVMConnection
 
-__all__ = ['initialize_evm_connection', 'get_evm_connection', 'EVMConnection'] 
\ No newline at end of file
+__all__ = ['initialize_evm_connection', 'get_evm_connection', 'get_http_session', 'batch_calls', 'EVMConnection'] 
\ No newline at end of file
@@ -7,6 +7,9 @@ and provides functions to interact with them.
 import os
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 
 # Default RPC endpoints for different networks
@@ -16,6 +19,22 @@ DEFAULT_NETWORKS = {
     'flare': 'https://flare-api.flare.network/ext/C/rpc',
 }
 
+def _create_http_session():
+    """Create an HTTP session with a connection pool sized for concurrent RPC traffic"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Shared session so RPC and explorer requests reuse keep-alive connections instead of
+# paying a new TCP + TLS handshake each time
+_http_session = _create_http_session()
+
+def get_http_session():
+    """Get the shared, connection-pooled HTTP session"""
+    return _http_session
+
 # Default RPC URL to use if none is specified
 DEFAULT_RPC_URL = 'https://coston-api.flare.network/ext/bc/C/rpc'
 
@@ -57,7 +76,7 @@ class EVMConnection:
         """Establish connection to the EVM blockchain"""
         try:
             start_time = time.time()
-            self.web3 = Web3(Web3.HTTPProvider(self.rpc_url))
+            self.web3 = Web3(Web3.HTTPProvider(self.rpc_url, session=get_http_session()))
             
             # Check connection
             if self.web3.is_connected():
@@ -108,6 +127,13 @@ class EVMConnection:
             'network': self.network_info
         }
     
+    def get_chain_id(self):
+        """Get the chain ID, fetching it over RPC only if it isn't known yet"""
+        if self.network_info.get('chain_id') is None:
+            # The chain ID never changes for a connection, so keep it in network_info
+            self.network_info['chain_id'] = self.web3.eth.chain_id
+        return self.network_info['chain_id']
+    
     def get_eth_balance(self, address):
         """Get ETH balance for an address"""
         if not self.connected or not self.web3:
@@ -174,6 +200,29 @@ class EVMConnection:
             print(f"Error getting token balance: {str(e)}")
             return None
 
+def batch_calls(web3, calls):
+    """
+    Issue several read-only RPC calls as a single JSON-RPC batch.
+    
+    Args:
+        web3: The Web3 instance to use
+        calls: Zero-argument callables that each make one request,
+            e.g. lambda: web3.eth.get_balance(address)
+            
+    Returns:
+        A list with the result of each call, in order
+    """
+    try:
+        with web3.batch_requests() as batch:
+            for call in calls:
+                batch.add(call())
+            return batch.execute()
+    except Exception:
+        # The provider doesn't support batching (or the batch failed), so run the calls concurrently
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = [executor.submit(call) for call in calls]
+            return [future.result() for future in futures]
+
 # Global instance that can be imported and used throughout the application
 evm_connection = None
 